@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Build SQL agents for MCP_WARM_AGENT_CONNECTIONS in the background; only server
+# processes load this module, so management commands never start the warmup
+from mcp.ai_agent import start_agent_warmup  # noqa: E402
+
+start_agent_warmup()
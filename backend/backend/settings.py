@@ -79,6 +79,10 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Keep connections open between requests instead of reconnecting every time.
+        # Behind PgBouncer (pool_mode=transaction) set DB_CONN_MAX_AGE=0 and let it pool.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -143,6 +147,12 @@ FRONTEND_DIR = BASE_DIR.parent / 'frontend'
 FRONTEND_DIST_DIR = FRONTEND_DIR / 'dist'
 FRONTEND_INDEX_FILE = FRONTEND_DIST_DIR / 'index.html'
 
+# Serve the Vite build (e.g. /assets/index-B3x9aKz1.js) straight from WhiteNoise middleware.
+# Hashed assets never change, so they get a one year immutable Cache-Control header.
+WHITENOISE_ROOT = FRONTEND_DIST_DIR
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^/assets/.+-[\w-]{8,}\.\w+$'
+WHITENOISE_MAX_AGE = 0 if DEBUG else 3600
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -175,6 +185,55 @@ OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0'))
 # Gemini Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
+# AI Query Cache Configuration
+# Seconds to keep answers to repeated natural language queries (0 disables).
+# Off by default: entries are only invalidated when the connection config changes, so
+# writes to the queried database are not seen until the entry expires.
+# Uses the default Django cache; point CACHES at Redis to share it between workers.
+MCP_QUERY_CACHE_TTL = int(os.getenv('MCP_QUERY_CACHE_TTL', '0'))
+
+# On an exact cache miss, reuse the answer of a recent question whose embedding has at least
+# this cosine similarity and the same numbers/quoted strings (e.g. 0.95). Off by default (0):
+# every miss then costs an embeddings call, and similar questions can still need different SQL.
+MCP_SEMANTIC_CACHE_THRESHOLD = float(os.getenv('MCP_SEMANTIC_CACHE_THRESHOLD', '0'))
+MCP_EMBEDDING_MODEL = os.getenv('MCP_EMBEDDING_MODEL', 'text-embedding-3-small')
+
+# Sample rows the SQL agent includes in table info (0 skips the extra SELECT per table)
+MCP_AGENT_SAMPLE_ROWS = int(os.getenv('MCP_AGENT_SAMPLE_ROWS', '3' if DEBUG else '0'))
+
+# Seconds rendered table info (schema + sample rows) is reused before being rebuilt
+MCP_TABLE_INFO_TTL = int(os.getenv('MCP_TABLE_INFO_TTL', '3600'))
+
+# Databases with at most this many usable tables skip the tool-calling agent loop and
+# generate SQL in a single LLM call with the full schema in the prompt (0 always uses the agent)
+MCP_SINGLE_SHOT_MAX_TABLES = int(os.getenv('MCP_SINGLE_SHOT_MAX_TABLES', '3'))
+
+# Return AI query answers without waiting for chart rendering; the response carries a
+# visualization_task_id to poll at /api/mcp/ai-query/visualization/<task_id>/
+MCP_DEFER_VISUALIZATION = os.getenv('MCP_DEFER_VISUALIZATION', 'false').lower() == 'true'
+
+# Seconds MCP audit rows (OpenAIMCPResponse) are buffered in memory before a batched insert.
+# Rows still buffered are lost if the process is killed (SIGKILL/OOM) before the flush;
+# set to 0 to write each row as it is created.
+MCP_WRITE_BUFFER_INTERVAL = float(os.getenv('MCP_WRITE_BUFFER_INTERVAL', '0.2'))
+
+# Max built SQL agents kept per process (least recently used are dropped)
+MCP_AGENT_CACHE_SIZE = int(os.getenv('MCP_AGENT_CACHE_SIZE', '32'))
+
+# Names of SQLDatabaseConnection rows whose agents are built in the background when the
+# ASGI/WSGI server starts
+# (comma-separated; empty disables warmup)
+MCP_WARM_AGENT_CONNECTIONS = [
+    name.strip() for name in os.getenv('MCP_WARM_AGENT_CONNECTIONS', '').split(',') if name.strip()
+]
+
+# Upper bounds on a single SQL agent run (LLM steps / wall-clock seconds)
+MCP_MAX_AGENT_ITERATIONS = int(os.getenv('MCP_MAX_AGENT_ITERATIONS', '6'))
+MCP_MAX_EXECUTION_SEC = float(os.getenv('MCP_MAX_EXECUTION_SEC', '20'))
+
+# Max tokens per SQL agent completion; bounds decode time of a single step
+MCP_AGENT_MAX_TOKENS = int(os.getenv('MCP_AGENT_MAX_TOKENS', '512'))
+
 # LangChain Configuration
 LANGCHAIN_TRACING_V2 = os.getenv('LANGCHAIN_TRACING_V2', 'false').lower() == 'true'
 LANGCHAIN_API_KEY = os.getenv('LANGCHAIN_API_KEY', '')
@@ -217,6 +276,10 @@ UNFOLD = {
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'mcp.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
 }
@@ -17,8 +17,6 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
-from django.conf import settings
-from django.views.static import serve
 
 from .views import FrontendAppView
 
@@ -35,14 +33,7 @@ urlpatterns = [
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 
-# Serve static files in development
-if settings.DEBUG:
-    # Serve React assets (CSS, JS)
-    urlpatterns += [
-        re_path(r'^assets/(?P<path>.*)$', serve, {
-            'document_root': settings.BASE_DIR.parent / 'frontend' / 'dist' / 'assets',
-        }),
-    ]
+# React assets (CSS, JS) are served by WhiteNoise from WHITENOISE_ROOT
 
 # Serve React frontend for Telegram Mini App (must be last!)
 # Only catch paths that don't start with 'admin' or 'api'
@@ -1,11 +1,14 @@
 from django.conf import settings
-from django.http import FileResponse, HttpResponse
+from django.http import HttpResponse
 from django.views import View
 
 
 class FrontendAppView(View):
     """Serve the compiled frontend entry point without using the template engine."""
 
+    # (mtime_ns, bytes) of the last index.html read; refreshed when the build changes
+    _index_cache = None
+
     def _missing_frontend_response(self):
         message = (
             "Frontend build not found. Run `npm install` and `npm run build` in the frontend "
@@ -13,9 +16,22 @@ class FrontendAppView(View):
         )
         return HttpResponse(message, status=503, content_type="text/plain")
 
+    @classmethod
+    def _read_index(cls, index_path):
+        mtime_ns = index_path.stat().st_mtime_ns
+        cached = cls._index_cache
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, index_path.read_bytes())
+            cls._index_cache = cached
+        return cached[1]
+
     def get(self, request, *args, **kwargs):
-        index_path = settings.FRONTEND_INDEX_FILE
-        if not index_path.exists():
+        try:
+            content = self._read_index(settings.FRONTEND_INDEX_FILE)
+        except FileNotFoundError:
             return self._missing_frontend_response()
 
-        return FileResponse(open(index_path, "rb"), content_type="text/html")
+        response = HttpResponse(content, content_type="text/html")
+        # The shell must be revalidated so new hashed asset URLs are picked up after a deploy
+        response["Cache-Control"] = "no-cache"
+        return response
@@ -1,5 +1,8 @@
 from django.contrib import admin
+from django.db.models import Q
 from unfold.admin import ModelAdmin, TabularInline
+from .admin_filters import cached_values_filter
+from .admin_paginators import EstimatedCountPaginator
 from .models import (
     OpenAIMCPRequest,
     OpenAIMCPResponse,
@@ -12,6 +15,22 @@ from .models import (
 )
 
 
+# ============================================
+# Admin Mixins
+# ============================================
+
+class ChangelistDeferMixin:
+    """Skip loading large JSON/text columns that the changelist never displays"""
+    changelist_defer = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if self.changelist_defer and match and (match.url_name or '').endswith('_changelist'):
+            queryset = queryset.defer(*self.changelist_defer)
+        return queryset
+
+
 # ============================================
 # Inline Admin Classes
 # ============================================
@@ -24,6 +43,10 @@ class OpenAIMCPResponseInline(TabularInline):
     readonly_fields = ('response_id', 'processing_time_ms', 'created_at')
     can_delete = False
 
+    def get_queryset(self, request):
+        # Row labels use __str__, which reads request.method
+        return super().get_queryset(request).select_related('request')
+
 
 class SQLToolExecutionInline(TabularInline):
     """Inline for SQL Tool Executions"""
@@ -33,6 +56,10 @@ class SQLToolExecutionInline(TabularInline):
     readonly_fields = ('execution_time_ms', 'created_at')
     can_delete = False
 
+    def get_queryset(self, request):
+        # Row labels use __str__, which reads database.name
+        return super().get_queryset(request).select_related('database')
+
 
 class MCPRequestLogInline(TabularInline):
     """Inline for MCP Request Logs"""
@@ -48,13 +75,16 @@ class MCPRequestLogInline(TabularInline):
 # ============================================
 
 @admin.register(OpenAIMCPRequest)
-class OpenAIMCPRequestAdmin(ModelAdmin):
+class OpenAIMCPRequestAdmin(ChangelistDeferMixin, ModelAdmin):
     """Admin for MCP Requests"""
     list_display = ('request_id', 'method', 'session_id', 'user_id', 'created_at')
     list_filter = ('method', 'created_at', 'session_id')
-    search_fields = ('request_id', 'method', 'session_id', 'user_id')
+    # IDs are prefix-matched (^) and method exact-matched (=) so every branch can use an index
+    search_fields = ('^request_id', '=method', '^session_id', '^user_id')
     readonly_fields = ('jsonrpc', 'request_id', 'created_at', 'raw_request')
-    date_hierarchy = 'created_at'
+    changelist_defer = ('params', 'raw_request')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -74,13 +104,16 @@ class OpenAIMCPRequestAdmin(ModelAdmin):
 
 
 @admin.register(OpenAIMCPResponse)
-class OpenAIMCPResponseAdmin(ModelAdmin):
+class OpenAIMCPResponseAdmin(ChangelistDeferMixin, ModelAdmin):
     """Admin for MCP Responses"""
     list_display = ('response_id', 'request', 'status', 'processing_time_ms', 'created_at')
     list_filter = ('status', 'created_at')
-    search_fields = ('response_id', 'request__request_id', 'request__method')
+    search_fields = ('^response_id', '^request__request_id', '=request__method')
     readonly_fields = ('request', 'jsonrpc', 'response_id', 'processing_time_ms', 'created_at', 'raw_response')
-    date_hierarchy = 'created_at'
+    list_select_related = ('request',)
+    changelist_defer = ('result', 'error', 'raw_response', 'request__params', 'request__raw_request')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -135,13 +168,16 @@ class SQLDatabaseConnectionAdmin(ModelAdmin):
 
 
 @admin.register(SQLToolExecution)
-class SQLToolExecutionAdmin(ModelAdmin):
+class SQLToolExecutionAdmin(ChangelistDeferMixin, ModelAdmin):
     """Admin for SQL Tool Executions"""
     list_display = ('id', 'tool_name', 'database', 'status', 'execution_time_ms', 'created_at')
     list_filter = ('tool_name', 'status', 'database', 'created_at')
     search_fields = ('tool_name', 'database__name', 'sql_query', 'error_message')
     readonly_fields = ('mcp_request', 'database', 'tool_name', 'execution_time_ms', 'created_at', 'completed_at')
-    date_hierarchy = 'created_at'
+    list_select_related = ('database',)
+    changelist_defer = ('tool_input', 'tool_output', 'sql_query', 'query_result', 'error_message')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -169,13 +205,19 @@ class SQLToolExecutionAdmin(ModelAdmin):
 # ============================================
 
 @admin.register(MCPRequestLog)
-class MCPRequestLogAdmin(ModelAdmin):
+class MCPRequestLogAdmin(ChangelistDeferMixin, ModelAdmin):
     """Admin for MCP Request Logs"""
     list_display = ('function_name', 'mcp_request', 'should_continue', 'created_at')
     list_filter = ('function_name', 'should_continue', 'created_at')
     search_fields = ('function_name', 'user_query', 'sql_query', 'mcp_request__request_id')
     readonly_fields = ('mcp_request', 'function_name', 'created_at')
-    date_hierarchy = 'created_at'
+    list_select_related = ('mcp_request',)
+    changelist_defer = (
+        'user_query', 'sql_query', 'db_response', 'mcp_response',
+        'mcp_request__params', 'mcp_request__raw_request',
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -232,6 +274,9 @@ class MCPSessionAdmin(ModelAdmin):
     list_filter = ('is_active', 'database', 'created_at', 'last_activity')
     search_fields = ('session_id', 'user_id', 'database__name')
     readonly_fields = ('session_id', 'created_at', 'last_activity')
+    list_select_related = ('database',)
+    raw_id_fields = ('database',)
+    show_full_result_count = False
     date_hierarchy = 'last_activity'
     ordering = ('-last_activity',)
     
@@ -268,22 +313,23 @@ class TransactionAdmin(admin.ModelAdmin):
         'wallet_type',
     ]
     
+    # Option lists are cached instead of a SELECT DISTINCT per column on every page
     list_filter = [
-        'transaction_type',
-        'issuer_bank_name',
-        'mcc_category',
-        'merchant_city',
-        'transaction_currency',
-        'pos_entry_mode',
-        'wallet_type',
-        'acquirer_country_iso',
+        cached_values_filter('transaction_type'),
+        cached_values_filter('issuer_bank_name'),
+        cached_values_filter('mcc_category'),
+        cached_values_filter('merchant_city'),
+        cached_values_filter('transaction_currency'),
+        cached_values_filter('pos_entry_mode'),
+        cached_values_filter('wallet_type'),
+        cached_values_filter('acquirer_country_iso'),
         'transaction_timestamp',
     ]
     
+    # Text columns are backed by trigram indexes; card_id/merchant_id are
+    # matched exactly in get_search_results
     search_fields = [
         'transaction_id',
-        'card_id',
-        'merchant_id',
         'issuer_bank_name',
         'merchant_city',
         'mcc_category',
@@ -295,9 +341,10 @@ class TransactionAdmin(admin.ModelAdmin):
         'updated_at',
     ]
     
-    date_hierarchy = 'transaction_timestamp'
-    
     list_per_page = 50
+    list_max_show_all = 200
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Transaction Information', {
@@ -345,6 +392,17 @@ class TransactionAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_search_results(self, request, queryset, search_term):
+        """Match numeric terms against card/merchant IDs via their btree indexes."""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+
+        term = search_term.strip()
+        # icontains on a bigint casts every row to text; exact match uses the index
+        if term.isdigit() and len(term) <= 18:
+            results |= queryset.filter(Q(card_id=term) | Q(merchant_id=term))
+
+        return results, may_have_duplicates
+
     def has_add_permission(self, request):
         """Allow manual addition of transactions via admin."""
         return True
\ No newline at end of file
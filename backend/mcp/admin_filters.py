@@ -0,0 +1,53 @@
+"""
+Admin list filters for large tables
+"""
+
+from django.contrib.admin import SimpleListFilter
+from django.core.cache import cache
+
+
+class CachedValuesListFilter(SimpleListFilter):
+    """
+    Filter on the distinct values of a column, with the option list cached
+
+    Django's default filter for a plain column runs SELECT DISTINCT over the
+    whole table on every changelist render. The set of banks, cities,
+    categories, etc. rarely changes, so it is computed once per cache_timeout.
+    """
+
+    field_name = None
+    cache_timeout = 3600
+
+    def __init__(self, request, params, model, model_admin):
+        if self.title is None:
+            self.title = model._meta.get_field(self.field_name).verbose_name
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        model = model_admin.model
+        cache_key = f"admin_filter:{model._meta.label_lower}:{self.field_name}"
+        values = cache.get_or_set(
+            cache_key,
+            lambda: list(
+                model.objects.exclude(**{f"{self.field_name}__isnull": True})
+                .order_by(self.field_name)
+                .values_list(self.field_name, flat=True)
+                .distinct()
+            ),
+            self.cache_timeout,
+        )
+        return [(value, value) for value in values]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.field_name: self.value()})
+
+
+def cached_values_filter(field_name: str) -> type:
+    """Build a CachedValuesListFilter subclass for field_name"""
+    return type(
+        f"Cached{field_name.title().replace('_', '')}Filter",
+        (CachedValuesListFilter,),
+        {"field_name": field_name, "parameter_name": field_name},
+    )
@@ -0,0 +1,47 @@
+"""
+Admin paginators for large tables
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the Postgres planner row estimate for unfiltered lists
+
+    COUNT(*) on a multi-million row table is a full scan on every changelist
+    page. When no filter/search is applied the count only drives the page
+    links, so pg_class.reltuples (kept fresh by autovacuum/ANALYZE) is good
+    enough. Filtered querysets and small tables still get an exact count.
+    """
+
+    # Below this estimate an exact COUNT(*) is cheap, so keep it exact
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def _estimated_count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where or query.distinct or query.combinator:
+            return None
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 for tables that were never vacuumed/analyzed
+        return row[0] if row else None
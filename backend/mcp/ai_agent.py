@@ -4,26 +4,231 @@ Processes user queries in natural language and executes SQL automatically
 Optimized for performance with caching and reduced iterations
 """
 
-from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
+from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_openai import ChatOpenAI
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from typing import Dict, Any, Optional
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+from typing import Dict, Any, Iterator, List, Optional
+from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, date
+from functools import lru_cache
+import asyncio
 import time
 import logging
 import pandas as pd
+import queue
+import re
 import threading
 
-from .models import SQLDatabaseConnection, SQLToolExecution, OpenAIMCPRequest
-from .utils import is_openai_configured
+from .models import SQLDatabaseConnection, SQLToolExecution, OpenAIMCPRequest, OpenAIMCPResponse
+from .utils import (
+    is_openai_configured,
+    get_openai_http_client,
+    get_openai_client,
+    get_sql_database,
+    get_sql_engine,
+    generate_request_id,
+    create_mcp_error_response,
+    MCP_ERROR_CODES,
+    apply_row_limit,
+    is_select_query,
+    starts_with_select,
+    validate_sql_query,
+)
 from .visualization import VisualizationGenerator
+from .query_cache import QueryResultCache
 
 logger = logging.getLogger(__name__)
 
-# Agent instance cache (thread-safe)
-_agent_cache = {}
+# Agent instance cache (thread-safe, least recently used first), keyed by database connection ID
+_agent_cache = OrderedDict()
 _cache_lock = threading.Lock()
 
+# Upper bound on rows fetched when re-running agent SQL for preview/visualization
+MAX_RESULT_ROWS = 1000
+
+# Connections with more usable tables than this get no sample rows in table info
+WIDE_SCHEMA_TABLES = 20
+
+# Seconds to wait for a prefetched preview DataFrame once the agent has finished
+PREFETCH_TIMEOUT = 10
+
+# Token stream coalescing: the first token is sent alone, later batches grow by
+# STREAM_BATCH_GROWTH_FACTOR up to STREAM_MAX_BATCH_SIZE tokens, each waiting at most STREAM_FLUSH_INTERVAL seconds
+STREAM_FLUSH_INTERVAL = 0.05
+STREAM_MAX_BATCH_SIZE = 50
+STREAM_BATCH_GROWTH_FACTOR = 3
+
+# Bounds on what an agent run stores in SQLToolExecution (last N queries, chars per query/answer)
+MAX_STORED_QUERIES = 3
+MAX_STORED_QUERY_CHARS = 500
+MAX_STORED_OUTPUT_CHARS = 4000
+
+# Rows the single-shot chain asks the LLM to limit results to unless the question says otherwise
+SINGLE_SHOT_TOP_K = 10
+
+# Prefix of the output AgentExecutor returns when it hits max_iterations/max_execution_time
+AGENT_STOPPED_PREFIX = "Agent stopped due to"
+
+SINGLE_SHOT_SQL_PROMPT = """You are a {dialect} expert. Given the question, write one syntactically correct {dialect} SELECT query that answers it.
+Unless the question asks for a specific number of rows, limit the query to at most {top_k} results.
+Only select the columns needed to answer the question. Never write INSERT, UPDATE, DELETE, DROP or other DML/DDL statements.
+Return only the SQL query, without explanation or markdown.
+
+Only use the following tables:
+{table_info}"""
+
+SINGLE_SHOT_ANSWER_PROMPT = """Answer the user's question using the SQL query and its result.
+Be concise. If the result is empty, say that no matching data was found."""
+
+_SQL_FENCE_RE = re.compile(r"^\s*```(?:sql)?\s*|\s*```\s*$", re.IGNORECASE)
+
+# Background pool fetching preview DataFrames while the agent is still running
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sql-prefetch")
+
+# Background pool rendering charts when MCP_DEFER_VISUALIZATION is on
+_visualization_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="visualization")
+
+# Cache key prefix of deferred visualization results (task_id -> {"status", "visualization"})
+VISUALIZATION_CACHE_PREFIX = "mcp:visualization"
+
+
+def _captured_select(serialized, input_str, inputs) -> Optional[str]:
+    """Return the SELECT passed to a sql_db_query tool start event, or None for other tools/statements"""
+    if (serialized or {}).get("name") != "sql_db_query":
+        return None
+
+    query = inputs.get("query") if isinstance(inputs, dict) else input_str
+    return query if starts_with_select(query) else None
+
+
+class SQLCaptureCallback(BaseCallbackHandler):
+    """
+    Collect SELECT queries passed to the sql_db_query tool during an agent run
+
+    With a prefetch function, each captured query is also submitted to a
+    background pool as the tool starts, so its preview DataFrame is fetched
+    while the LLM is still writing the answer.
+    """
+
+    def __init__(self, prefetch=None):
+        self.sql_queries = []
+        self.prefetch = prefetch
+        self._prefetched: Dict[str, Future] = {}
+
+    def on_tool_start(self, serialized, input_str, *, inputs=None, **kwargs):
+        query = _captured_select(serialized, input_str, inputs)
+        if query is None:
+            return
+
+        self.sql_queries.append(query)
+        logger.debug("Captured SQL query: %.100s...", query)
+        if self.prefetch is not None and query not in self._prefetched:
+            self._prefetched[query] = _prefetch_executor.submit(self.prefetch, query)
+
+    def take_prefetched(self, query: Optional[str]) -> Optional[Future]:
+        """Return the prefetch future for query and cancel the others"""
+        future = self._prefetched.pop(query, None)
+        for other in self._prefetched.values():
+            other.cancel()
+        self._prefetched.clear()
+        return future
+
+
+class StreamEventCallback(BaseCallbackHandler):
+    """Forward LLM tokens, executed SQL and its results of an agent run to a queue as stream events"""
+
+    def __init__(self, events: "queue.Queue[Dict[str, Any]]"):
+        self.events = events
+        self._sql_runs = set()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        # Tool-calling steps stream their arguments separately, so non-empty tokens are answer text
+        if token:
+            self.events.put({"type": "token", "text": token})
+
+    def on_tool_start(self, serialized, input_str, *, inputs=None, run_id=None, **kwargs):
+        query = _captured_select(serialized, input_str, inputs)
+        if query is not None:
+            self._sql_runs.add(run_id)
+            self.events.put({"type": "sql", "query": query})
+
+    def on_tool_end(self, output, *, run_id=None, **kwargs):
+        if run_id in self._sql_runs:
+            self._sql_runs.discard(run_id)
+            self.events.put({"type": "sql_result", "output": str(output)[:MAX_STORED_OUTPUT_CHARS]})
+
+    def on_answer(self, result: str, sql_query: Optional[str]):
+        """Called by SQLAIAgent.query once the agent has answered, before visualization and persistence"""
+        self.events.put({"type": "answer", "result": result, "sql_query": sql_query})
+
+
+@lru_cache(maxsize=8)
+def _get_agent_llm(model_name: str, api_key: str) -> ChatOpenAI:
+    """Build the ChatOpenAI used by SQL agents, reused across agents for all connections"""
+    return ChatOpenAI(
+        model=model_name,
+        temperature=0.0,  # Lower temperature for more deterministic SQL (faster)
+        api_key=api_key,
+        timeout=15.0,  # Timeout for individual LLM calls
+        max_retries=1,  # Reduce retries for speed
+        max_tokens=getattr(settings, 'MCP_AGENT_MAX_TOKENS', 512),  # Cap each completion (tool call SQL or answer)
+        streaming=True,  # Emit on_llm_new_token so answers can be streamed (invoke still returns the full message)
+        http_client=get_openai_http_client(),  # Shared keep-alive connections
+    )
+
+
+class SingleShotSQLChain:
+    """
+    Answer questions over a small schema with one SQL call and one answer call
+
+    Used instead of the tool-calling agent when the whole schema fits in the
+    prompt, skipping its list-tables/describe-table round-trips. Exposes the
+    agent executor's invoke({"input": ...}) -> {"output": ...} interface, and
+    runs the SQL through the sql_db_query tool so callbacks see it the same way.
+    """
+
+    def __init__(self, llm: ChatOpenAI, db):
+        self.llm = llm
+        self.db = db
+        self.query_tool = QuerySQLDatabaseTool(db=db)
+        self.sql_prompt = SINGLE_SHOT_SQL_PROMPT.format(
+            dialect=db.dialect,
+            top_k=SINGLE_SHOT_TOP_K,
+            table_info=db.get_table_info(),
+        )
+
+    def invoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        question = inputs["input"]
+
+        # Callbacks are not passed here so only answer tokens reach streaming callbacks
+        sql_message = self.llm.invoke([("system", self.sql_prompt), ("human", question)])
+        sql_query = _SQL_FENCE_RE.sub("", sql_message.content).strip()
+        # SQLDatabase.run commits, so only a single read-only SELECT may reach it
+        is_valid, error = validate_sql_query(sql_query)
+        if not is_valid or not is_select_query(sql_query):
+            raise ValueError(error or "Generated query is not a single SELECT statement")
+        # top_k is only a hint in the prompt; enforce it so the result fits the answer prompt
+        sql_query = apply_row_limit(sql_query, SINGLE_SHOT_TOP_K)
+
+        result = self.query_tool.invoke({"query": sql_query}, config=config)
+
+        answer = self.llm.invoke(
+            [
+                ("system", SINGLE_SHOT_ANSWER_PROMPT),
+                ("human", f"Question: {question}\nSQL query: {sql_query}\nSQL result: {result}"),
+            ],
+            config=config,
+        )
+        return {"output": answer.content}
+
 
 class SQLAIAgent:
     """AI Agent for natural language SQL queries (optimized for performance)"""
@@ -40,31 +245,39 @@ class SQLAIAgent:
         self.db = None
         self.agent = None
         self.use_cache = use_cache
-        
+
+        # Cached agent is only valid for the connection config it was built from
+        cache_key = database_connection.id
+        cache_version = (database_connection.database_uri, database_connection.updated_at)
+
         # Try to get cached agent first
         if use_cache:
-            cache_key = f"{database_connection.id}_{database_connection.database_uri}"
             with _cache_lock:
-                if cache_key in _agent_cache:
-                    cached = _agent_cache[cache_key]
+                cached = _agent_cache.get(cache_key)
+                if cached and cached['version'] == cache_version:
+                    _agent_cache.move_to_end(cache_key)
                     self.db = cached['db']
                     self.agent = cached['agent']
-                    logger.debug(f"Using cached agent for database {database_connection.id}")
+                    logger.debug("Using cached agent for database %s", database_connection.id)
                     return
         
         # Initialize new agent if not cached
         self._initialize_agent()
         
-        # Cache the agent instance
+        # Cache the agent instance (replaces any stale entry for this connection)
         if use_cache:
-            cache_key = f"{database_connection.id}_{database_connection.database_uri}"
             with _cache_lock:
                 _agent_cache[cache_key] = {
                     'db': self.db,
                     'agent': self.agent,
+                    'version': cache_version,
                     'timestamp': time.time()
                 }
-                logger.debug(f"Cached agent for database {database_connection.id}")
+                _agent_cache.move_to_end(cache_key)
+                # Bound memory when many connections are used: drop the least recently used agents
+                while len(_agent_cache) > getattr(settings, 'MCP_AGENT_CACHE_SIZE', 32):
+                    _agent_cache.popitem(last=False)
+                logger.debug("Cached agent for database %s", database_connection.id)
 
     def _initialize_agent(self):
         """Initialize LangChain SQL Agent with optimized settings"""
@@ -73,14 +286,33 @@ class SQLAIAgent:
 
         # Create SQLDatabase with optimized settings
         # Reduce sample_rows_in_table_info to speed up schema queries
-        sample_rows = min(self.connection.sample_rows_in_table_info or 3, 3)
+        # (each sample is an extra SELECT per table whenever the agent reads the schema)
+        sample_rows = min(
+            self.connection.sample_rows_in_table_info,
+            getattr(settings, 'MCP_AGENT_SAMPLE_ROWS', 3),
+        )
+        include_tables = tuple(self.connection.include_tables or ()) or None
         
-        self.db = SQLDatabase.from_uri(
+        # Shared per-configuration SQLDatabase: schema is reflected once per process
+        self.db = get_sql_database(
             self.connection.database_uri,
             sample_rows_in_table_info=sample_rows,  # Reduced from default
-            include_tables=self.connection.include_tables or None,
+            include_tables=include_tables,
         )
 
+        # On wide schemas the per-table sample SELECTs dominate rendering table info, so skip them
+        n_tables = len(self.db.get_usable_table_names())
+        if sample_rows and n_tables > WIDE_SCHEMA_TABLES:
+            logger.info(
+                "Skipping sample rows for database %s (%d usable tables)",
+                self.connection.id, n_tables,
+            )
+            self.db = get_sql_database(
+                self.connection.database_uri,
+                sample_rows_in_table_info=0,
+                include_tables=include_tables,
+            )
+
         # Use faster model for SQL generation (gpt-4o-mini is sufficient and 2-3x faster)
         # Override with gpt-4o-mini for speed unless explicitly set to something else
         model_name = getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini')
@@ -88,14 +320,14 @@ class SQLAIAgent:
             # If custom model, use it; otherwise default to mini for speed
             model_name = model_name if model_name else 'gpt-4o-mini'
         
-        # Create OpenAI LLM with optimized settings
-        llm = ChatOpenAI(
-            model=model_name,
-            temperature=0.0,  # Lower temperature for more deterministic SQL (faster)
-            api_key=settings.OPENAI_API_KEY,
-            timeout=15.0,  # Timeout for individual LLM calls
-            max_retries=1,  # Reduce retries for speed
-        )
+        # Shared OpenAI LLM with optimized settings (stateless, so one per model)
+        llm = _get_agent_llm(model_name, settings.OPENAI_API_KEY)
+
+        # Small schemas fit in one prompt: generate SQL in a single call instead of the tool loop
+        max_single_shot_tables = getattr(settings, 'MCP_SINGLE_SHOT_MAX_TABLES', 3)
+        if n_tables <= max_single_shot_tables:
+            self.agent = SingleShotSQLChain(llm, self.db)
+            return
 
         # Create SQL Agent with optimized parameters
         # Note: create_sql_agent uses its own optimized prompt internally
@@ -104,16 +336,17 @@ class SQLAIAgent:
             llm=llm,
             db=self.db,
             agent_type="openai-tools",  # Best for OpenAI models
-            verbose=True,  # Enable verbose logging to see agent steps
+            verbose=settings.DEBUG,  # Print agent steps only while debugging
             handle_parsing_errors=True,
-            max_iterations=6,  # Reduced from 10 to 6 (most queries need 3-4)
-            max_execution_time=20,  # Reduced from 30 to 20 seconds
+            max_iterations=getattr(settings, 'MCP_MAX_AGENT_ITERATIONS', 6),  # Most queries need 3-4
+            max_execution_time=getattr(settings, 'MCP_MAX_EXECUTION_SEC', 20),
         )
 
     def query(
         self,
         user_query: str,
-        mcp_request: Optional[OpenAIMCPRequest] = None
+        mcp_request: Optional[OpenAIMCPRequest] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
     ) -> Dict[str, Any]:
         """
         Process natural language query and return results (optimized)
@@ -121,113 +354,86 @@ class SQLAIAgent:
         Args:
             user_query: Natural language query from user
             mcp_request: Optional MCP request for tracking
+            callbacks: Extra LangChain callbacks attached to the agent run
 
         Returns:
             dict with success, result/error, execution details
         """
         start_time = time.time()
 
-        # Create tool execution record
-        tool_execution = SQLToolExecution.objects.create(
-            mcp_request=mcp_request,
-            database=self.connection,
-            tool_name="SQLAIAgent",
-            tool_input={"user_query": user_query},
-            status="pending",
+        # Answer repeated questions from cache (skips LLM and SQL round-trips)
+        result_cache = QueryResultCache(
+            self.connection.id,
+            version=self.connection.updated_at.isoformat() if self.connection.updated_at else "",
         )
+        cached_response = result_cache.get(user_query)
+        if cached_response is not None:
+            logger.info("Returning cached answer for query: %s", user_query)
+            if mcp_request is not None and mcp_request.pk is None:
+                mcp_request.save()
+            return {
+                **cached_response,
+                "user_query": user_query,
+                "execution_time_ms": int((time.time() - start_time) * 1000),
+                "cached": True,
+                # The stored execution row belongs to the request that populated the cache
+                "tool_execution_id": None,
+            }
 
         try:
-            # Execute agent and capture SQL queries from tool calls
-            logger.info(f"AI Agent processing query: {user_query}")
-            
-            # Use stream to capture tool calls with SQL queries (for AgentExecutor)
-            sql_queries = []
-            final_output = None
-            
+            # Execute agent; SQL is captured from sql_db_query tool calls as they start
+            logger.info("AI Agent processing query: %s", user_query)
+            sql_capture = SQLCaptureCallback(prefetch=self._execute_sql_to_dataframe)
             try:
-                # AgentExecutor.stream() returns chunks with actions and steps
-                for chunk in self.agent.stream({"input": user_query}):
-                    # Extract SQL from actions in each chunk
-                    if "actions" in chunk:
-                        for action in chunk["actions"]:
-                            if hasattr(action, "tool"):
-                                tool_name = action.tool
-                                # Capture SQL queries from sql_db_query tool (not checker)
-                                if tool_name == "sql_db_query":
-                                    if hasattr(action, "tool_input"):
-                                        tool_input = action.tool_input
-                                        if isinstance(tool_input, dict) and "query" in tool_input:
-                                            query = tool_input["query"]
-                                            if isinstance(query, str) and query.strip().upper().startswith("SELECT"):
-                                                sql_queries.append(query)
-                                                logger.debug(f"Captured SQL query: {query[:100]}...")
-                    
-                    # Also check steps (some chunks have steps instead of actions)
-                    if "steps" in chunk:
-                        for step in chunk["steps"]:
-                            if hasattr(step, "action"):
-                                action = step.action
-                                if hasattr(action, "tool") and action.tool == "sql_db_query":
-                                    if hasattr(action, "tool_input"):
-                                        tool_input = action.tool_input
-                                        if isinstance(tool_input, dict) and "query" in tool_input:
-                                            query = tool_input["query"]
-                                            if isinstance(query, str) and query.strip().upper().startswith("SELECT"):
-                                                sql_queries.append(query)
-                                                logger.debug(f"Captured SQL query from steps: {query[:100]}...")
-                    
-                    # Keep track of final output
-                    if "output" in chunk:
-                        final_output = chunk["output"]
-                    elif "messages" in chunk and chunk["messages"]:
-                        # Check last message for output
-                        last_msg = chunk["messages"][-1]
-                        if hasattr(last_msg, "content") and last_msg.content:
-                            final_output = last_msg.content
-                
-                # If we didn't get output from stream, use invoke (but with timeout)
-                if final_output is None:
-                    logger.debug("No output from stream, using invoke")
-                    result = self.agent.invoke({"input": user_query})
-                    final_output = result.get("output", "")
-            except Exception as stream_error:
-                # If streaming fails, fall back to invoke
-                logger.warning(f"Streaming failed, using invoke: {stream_error}")
-                result = self.agent.invoke({"input": user_query})
-                final_output = result.get("output", "")
-            
+                result = self.agent.invoke(
+                    {"input": user_query},
+                    config={"callbacks": [sql_capture, *(callbacks or [])]},
+                )
+            except Exception:
+                sql_capture.take_prefetched(None)
+                raise
+            final_output = result.get("output", "")
+            sql_queries = sql_capture.sql_queries
+
             execution_time = int((time.time() - start_time) * 1000)
-            logger.info(f"Agent execution completed in {execution_time}ms")
+            logger.info("Agent execution completed in %sms", execution_time)
+
+            # Use the last SELECT the agent ran
+            sql_query = sql_queries[-1] if sql_queries else None
+            df_future = sql_capture.take_prefetched(sql_query)
 
-            # Extract SQL query - use captured queries or fall back to extraction method
-            sql_query = None
-            if sql_queries:
-                sql_query = sql_queries[-1]  # Use the last SELECT query
-                logger.info(f"Using SQL query from stream: {sql_query[:100]}...")
+            # Let streaming callers show the answer while the preview/chart is built and the run is stored
+            for callback in callbacks or ():
+                if isinstance(callback, StreamEventCallback):
+                    callback.on_answer(final_output or "", sql_query)
+
+            if sql_query:
+                logger.info("Using captured SQL query: %.100s...", sql_query)
             else:
-                # Create a result dict for extraction method
-                result_dict = {"output": final_output} if final_output else {}
-                sql_query = self._extract_sql_query(result_dict, mcp_request)
-                if sql_query:
-                    logger.info(f"Extracted SQL query from fallback method: {sql_query[:100]}...")
-                else:
-                    logger.warning("No SQL query could be extracted from agent execution")
+                logger.warning("No SQL query could be extracted from agent execution")
 
             # Generate visualization if applicable (optimized - non-blocking)
             visualization = None
+            visualization_future = None
             data_preview = None
             total_rows = 0
 
             if sql_query:  # Only if we have SQL query
                 try:
-                    logger.debug(f"Generating visualization for SQL: {sql_query[:100]}...")
-                    # Execute SQL to get DataFrame for visualization
-                    df = self._execute_sql_to_dataframe(sql_query)
+                    logger.debug("Generating visualization for SQL: %.100s...", sql_query)
+                    # DataFrame for visualization was fetched while the agent ran
+                    if df_future is not None:
+                        df = df_future.result(timeout=PREFETCH_TIMEOUT)
+                    else:
+                        df = self._execute_sql_to_dataframe(sql_query)
 
                     if df is not None and not df.empty:
-                        logger.debug(f"DataFrame: {len(df)} rows, {len(df.columns)} columns")
+                        logger.debug("DataFrame: %s rows, %s columns", len(df), len(df.columns))
 
-                        # Store total row count
+                        # Rows past MAX_RESULT_ROWS were not fetched, so the count is a lower bound
+                        truncated = len(df) > MAX_RESULT_ROWS
+                        if truncated:
+                            df = df.head(MAX_RESULT_ROWS)
                         total_rows = len(df)
 
                         # Create data preview (first 20 rows) for frontend display
@@ -241,62 +447,41 @@ class SQLAIAgent:
                             "columns": list(df.columns),
                             "rows": preview_data,
                             "total_rows": total_rows,
+                            "truncated": truncated,
                             "preview_rows": len(df_preview),
                             "has_more": total_rows > preview_limit,
                         }
-                        logger.debug(f"Created data preview: {len(preview_data)} rows")
-
-                        # Create OpenAI client for AI-powered visualization features
-                        openai_client = None
-                        try:
-                            from openai import OpenAI
-                            if hasattr(settings, 'OPENAI_API_KEY') and settings.OPENAI_API_KEY:
-                                # Use optimized timeout for visualization client
-                                try:
-                                    import httpx
-                                    timeout_config = httpx.Timeout(connect=2.0, read=5.0, write=2.0, pool=5.0)
-                                except ImportError:
-                                    timeout_config = 5.0
-                                
-                                openai_client = OpenAI(
-                                    api_key=settings.OPENAI_API_KEY,
-                                    timeout=timeout_config
-                                )
-                        except Exception as e:
-                            logger.debug(f"Could not initialize OpenAI client for visualization: {e}")
-                        
-                        viz_generator = VisualizationGenerator(openai_client=openai_client)
-                        should_viz = viz_generator.should_visualize(user_query, sql_query, df)
-                        
-                        if should_viz:
-                            visualization = viz_generator.generate_visualization(
-                                df=df,
-                                query=user_query,
-                                sql_query=sql_query,
-                                config={}
+                        logger.debug("Created data preview: %s rows", len(preview_data))
+
+                        # Chart rendering is independent of the answer; optionally return without waiting for it
+                        if getattr(settings, 'MCP_DEFER_VISUALIZATION', False):
+                            visualization_future = _visualization_executor.submit(
+                                self._generate_visualization, user_query, sql_query, df
                             )
-                            if visualization:
-                                logger.debug(f"Visualization generated: {visualization.get('chart_type')}")
                         else:
-                            logger.debug("Visualization not suitable for this query")
+                            visualization = self._generate_visualization(user_query, sql_query, df)
                     else:
                         logger.debug("DataFrame is empty, skipping visualization")
                 except Exception as e:
-                    logger.warning(f"Error generating visualization: {e}", exc_info=True)
+                    logger.warning("Error generating visualization: %s", e, exc_info=True)
                     # Continue without visualization - text response is more important
 
-            # Update tool execution
-            tool_execution.tool_output = {
-                "user_query": user_query,
-                "result": final_output or "",
-                "intermediate_steps": str(sql_queries)[:1000],
-                "visualization_generated": visualization is not None,
-            }
-            tool_execution.sql_query = sql_query
-            tool_execution.query_result = {"output": final_output or ""}
-            tool_execution.status = "success"
-            tool_execution.execution_time_ms = execution_time
-            tool_execution.save()
+            # Record tool execution
+            stored_output = (final_output or "")[:MAX_STORED_OUTPUT_CHARS]
+            tool_execution = self._record_execution(
+                user_query,
+                mcp_request,
+                tool_output={
+                    "user_query": user_query,
+                    "result": stored_output,
+                    "intermediate_steps": [query[:MAX_STORED_QUERY_CHARS] for query in sql_queries[-MAX_STORED_QUERIES:]],
+                    "visualization_generated": visualization is not None,
+                },
+                sql_query=sql_query,
+                query_result={"output": stored_output},
+                status="success",
+                execution_time_ms=execution_time,
+            )
 
             response = {
                 "success": True,
@@ -315,17 +500,32 @@ class SQLAIAgent:
             if visualization:
                 response["visualization"] = visualization
 
+            # Only cache real answers: a stopped agent or a run without SQL may succeed on retry
+            cacheable = bool(sql_query) and not (final_output or "").startswith(AGENT_STOPPED_PREFIX)
+            if cacheable:
+                # Stored before the deferred chart is tracked so its publish replaces this
+                # entry rather than being overwritten by it
+                result_cache.set(user_query, dict(response))
+
+            if visualization_future is not None:
+                response["visualization_task_id"] = _track_deferred_visualization(
+                    visualization_future, result_cache if cacheable else None, user_query, response
+                )
+
             return response
 
         except Exception as e:
             execution_time = int((time.time() - start_time) * 1000)
-            logger.error(f"AI Agent error: {e}", exc_info=True)
+            logger.error("AI Agent error: %s", e, exc_info=True)
 
-            # Update tool execution with error
-            tool_execution.status = "error"
-            tool_execution.error_message = str(e)
-            tool_execution.execution_time_ms = execution_time
-            tool_execution.save()
+            # Record tool execution with error
+            tool_execution = self._record_execution(
+                user_query,
+                mcp_request,
+                status="error",
+                error_message=str(e),
+                execution_time_ms=execution_time,
+            )
 
             return {
                 "success": False,
@@ -335,80 +535,118 @@ class SQLAIAgent:
                 "tool_execution_id": tool_execution.id,
             }
 
-    def _extract_sql_query(self, result: Dict, mcp_request: Optional[OpenAIMCPRequest] = None) -> Optional[str]:
+    def query_stream(
+        self,
+        user_query: str,
+        mcp_request: Optional[OpenAIMCPRequest] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process natural language query, yielding progress events as they happen
+
+        The agent runs in a worker thread; this generator yields
+        {"type": "sql", "query": ...} / {"type": "sql_result", "output": ...}
+        for each executed SELECT, {"type": "token", "text": ...} for answer
+        tokens, {"type": "answer", "result": ..., "sql_query": ...} as soon as
+        the agent is done, then a final {"type": "done", "response": ...}
+        carrying the dict query() returns (with preview/visualization).
+
+        Args:
+            user_query: Natural language query from user
+            mcp_request: Optional MCP request for tracking
+
+        Yields:
+            Stream event dicts
+        """
+        events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+        def run():
+            try:
+                response = self.query(user_query, mcp_request, callbacks=[StreamEventCallback(events)])
+            except Exception as e:
+                logger.error("AI Agent stream error: %s", e, exc_info=True)
+                response = {"success": False, "user_query": user_query, "error": str(e)}
+            finally:
+                # The thread ends here; close its DB connection (CONN_MAX_AGE would keep it open)
+                connections.close_all()
+            events.put({"type": "done", "response": response})
+
+        threading.Thread(target=run, name="ai-query-stream", daemon=True).start()
+
+        yield from _coalesce_tokens(events)
+
+    def _generate_visualization(self, user_query: str, sql_query: str, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
         """
-        Extract SQL query from agent result using multiple methods
+        Build a chart for the query results, if the data suits one
 
         Args:
-            result: Agent execution result
-            mcp_request: Optional MCP request to query related SQLToolExecution records
+            user_query: Natural language query from user
+            sql_query: SQL query the DataFrame came from
+            df: Query results
+
         Returns:
-            SQL query string or None
+            Visualization dict or None
         """
         try:
-            sql_queries = []
-            
-            # Method 1: Extract from messages in result (for openai-tools agent type)
-            if "messages" in result:
-                for message in result["messages"]:
-                    # Check if message has tool_calls
-                    if hasattr(message, "tool_calls") and message.tool_calls:
-                        for tool_call in message.tool_calls:
-                            tool_name = tool_call.get("name", "")
-                            tool_args = tool_call.get("args", {})
-                            
-                            if "sql" in tool_name.lower() and "query" in tool_name.lower():
-                                if isinstance(tool_args, dict) and "query" in tool_args:
-                                    query = tool_args["query"]
-                                    if isinstance(query, str) and query.strip().upper().startswith("SELECT"):
-                                        sql_queries.append(query)
-            
-            # Method 2: Try to extract from intermediate steps (for other agent types)
-            intermediate_steps = result.get("intermediate_steps", [])
-            for step in intermediate_steps:
-                if len(step) >= 2:
-                    action = step[0]
-                    if hasattr(action, "tool"):
-                        tool_name = action.tool
-                        if tool_name == "sql_db_query":
-                            if hasattr(action, "tool_input"):
-                                tool_input = action.tool_input
-                                if isinstance(tool_input, dict) and "query" in tool_input:
-                                    query = tool_input["query"]
-                                    if query.strip().upper().startswith("SELECT"):
-                                        sql_queries.append(query)
-                                elif isinstance(tool_input, str):
-                                    if tool_input.strip().upper().startswith("SELECT"):
-                                        sql_queries.append(tool_input)
-
-            # Method 3: Query SQLToolExecution records (fallback)
-            if not sql_queries and mcp_request:
-                from django.utils import timezone
-                from datetime import timedelta
-                
-                recent_executions = SQLToolExecution.objects.filter(
-                    mcp_request=mcp_request,
-                    sql_query__isnull=False,
-                    sql_query__startswith="SELECT",
-                    created_at__gte=timezone.now() - timedelta(minutes=1)
-                ).order_by('-created_at')
-                
-                if recent_executions.exists():
-                    sql_query = recent_executions.first().sql_query
-                    logger.debug(f"Extracted SQL query from SQLToolExecution: {sql_query[:100]}...")
-                    return sql_query
-
-            # Return the last SELECT query if found
-            if sql_queries:
-                logger.debug(f"Extracted SQL query: {sql_queries[-1][:100]}...")
-                return sql_queries[-1]
-
-            logger.debug("No SELECT query found in any extraction method")
-            return None
+            # Shared OpenAI client for AI-powered visualization features
+            openai_client = None
+            if getattr(settings, 'OPENAI_API_KEY', None):
+                openai_client = get_openai_client(settings.OPENAI_API_KEY)
+
+            viz_generator = VisualizationGenerator(openai_client=openai_client)
+            if not viz_generator.should_visualize(user_query, sql_query, df):
+                logger.debug("Visualization not suitable for this query")
+                return None
+
+            visualization = viz_generator.generate_visualization(
+                df=df,
+                query=user_query,
+                sql_query=sql_query,
+                config={}
+            )
+            if visualization:
+                logger.debug("Visualization generated: %s", visualization.get('chart_type'))
+            return visualization
+
         except Exception as e:
-            logger.error(f"Error extracting SQL query: {e}", exc_info=True)
+            logger.warning("Error generating visualization: %s", e, exc_info=True)
+            # Continue without visualization - text response is more important
             return None
 
+    def _record_execution(
+        self,
+        user_query: str,
+        mcp_request: Optional[OpenAIMCPRequest],
+        **fields,
+    ) -> SQLToolExecution:
+        """
+        Store the finished agent run as a single INSERT
+
+        The record is written once with its final status instead of being
+        created as "pending" before the LLM call and updated afterwards,
+        which keeps a DB round-trip off the critical path. An unsaved
+        mcp_request is inserted in the same transaction; no transaction is
+        open while the agent runs.
+
+        Args:
+            user_query: Natural language query from user
+            mcp_request: Optional MCP request for tracking
+            **fields: Result fields (status, tool_output, sql_query, ...)
+
+        Returns:
+            Created SQLToolExecution
+        """
+        with transaction.atomic():
+            if mcp_request is not None and mcp_request.pk is None:
+                mcp_request.save()
+            return SQLToolExecution.objects.create(
+                mcp_request=mcp_request,
+                database=self.connection,
+                tool_name="SQLAIAgent",
+                tool_input={"user_query": user_query},
+                completed_at=timezone.now(),
+                **fields,
+            )
+
     def _execute_sql_to_dataframe(self, sql_query: str) -> Optional[pd.DataFrame]:
         """
         Execute SQL query and return results as DataFrame
@@ -425,11 +663,25 @@ class SQLAIAgent:
 
             # Use the database connection to execute SQL
             # SQLDatabase has a run method that returns string, but we need DataFrame
-            # So we use pandas.read_sql directly with the database URI
-            return pd.read_sql(sql_query, self.connection.database_uri)
+            # So we use pandas.read_sql on the shared pooled engine for the URI
+            # One row past the cap tells the caller the result was truncated
+            fetch_rows = MAX_RESULT_ROWS + 1
+            sql_query = apply_row_limit(sql_query, fetch_rows)
+            with get_sql_engine(self.connection.database_uri).connect() as conn:
+                # Server-side cursor and a single chunk: a query with its own larger
+                # LIMIT is still cut off at the cap instead of fully fetched
+                conn = conn.execution_options(stream_results=True)
+                df = next(iter(pd.read_sql(sql_query, conn, chunksize=fetch_rows)), None)
+
+            if df is not None and df.columns.is_unique:
+                # Lossless downcast of integer columns (int64 -> smallest fitting type)
+                # Floats keep float64: float32 would change the values shown in the preview
+                for column in df.select_dtypes("integer").columns:
+                    df[column] = pd.to_numeric(df[column], downcast="integer")
+            return df
 
         except Exception as e:
-            logger.warning(f"Could not execute SQL to DataFrame: {e}")
+            logger.warning("Could not execute SQL to DataFrame: %s", e)
             return None
 
     def _dataframe_to_json_serializable(self, df: pd.DataFrame) -> list:
@@ -443,22 +695,74 @@ class SQLAIAgent:
         Returns:
             List of dictionaries with JSON-serializable values
         """
-        from decimal import Decimal
-        from datetime import datetime, date
+        columns = list(df.columns)
+        converted = []
 
-        records = df.to_dict('records')
+        # Convert column by column so the type dispatch runs once per column, not per cell
+        for _, series in df.items():
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = [None if pd.isna(value) else value.isoformat() for value in series]
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                values = series.astype(object).where(series.notna(), None).tolist()
+            else:
+                values = [_to_json_value(value) for value in series.tolist()]
+            converted.append(values)
+
+        return [dict(zip(columns, row)) for row in zip(*converted)]
 
-        # Convert non-serializable types
-        for record in records:
-            for key, value in record.items():
-                if isinstance(value, Decimal):
-                    record[key] = float(value)
-                elif isinstance(value, (datetime, date)):
-                    record[key] = value.isoformat()
-                elif pd.isna(value):
-                    record[key] = None
 
-        return records
+def _track_deferred_visualization(
+    future: Future,
+    result_cache: Optional[QueryResultCache],
+    user_query: str,
+    response: Dict[str, Any],
+) -> str:
+    """
+    Publish a background visualization under a task ID once it finishes
+
+    The result is stored in Django's cache for get_deferred_visualization,
+    and the cached query response (if result_cache is given) is updated to
+    carry the chart inline.
+
+    Returns:
+        Task ID the client polls with
+    """
+    task_id = generate_request_id("viz")
+    key = f"{VISUALIZATION_CACHE_PREFIX}:{task_id}"
+    timeout = max(result_cache.timeout if result_cache is not None else 0, 600)
+    cache.set(key, {"status": "pending"}, timeout)
+
+    def publish(done: Future):
+        visualization = None if done.cancelled() else done.result()
+        cache.set(key, {"status": "done", "visualization": visualization}, timeout)
+        if visualization and result_cache is not None:
+            cached_response = {k: v for k, v in response.items() if k != "visualization_task_id"}
+            result_cache.set(user_query, {**cached_response, "visualization": visualization})
+
+    future.add_done_callback(publish)
+    return task_id
+
+
+def get_deferred_visualization(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a deferred visualization
+
+    Returns:
+        {"status": "pending"} or {"status": "done", "visualization": ...},
+        or None for unknown/expired task IDs
+    """
+    return cache.get(f"{VISUALIZATION_CACHE_PREFIX}:{task_id}")
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert a single DataFrame cell (Decimal, datetime, NaN) to a JSON-serializable value"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    return value
 
 
 def process_natural_language_query(
@@ -479,20 +783,9 @@ def process_natural_language_query(
     Returns:
         dict with success status and results
     """
+    mcp_request = _build_ai_request(user_query, database_id, session_id, user_id)
     try:
-        # Get database connection
-        connection = SQLDatabaseConnection.objects.get(id=database_id, is_active=True)
-
-        # Create MCP request for tracking
-        mcp_request = OpenAIMCPRequest.objects.create(
-            jsonrpc="2.0",
-            method="ai_query",
-            params={"user_query": user_query, "database_id": database_id},
-            request_id=f"ai_query_{int(time.time() * 1000)}",
-            session_id=session_id,
-            user_id=user_id,
-            raw_request={"user_query": user_query, "database_id": database_id},
-        )
+        connection = _get_ai_connection(database_id)
 
         # Create and use AI Agent (with caching enabled)
         agent = SQLAIAgent(connection, use_cache=True)
@@ -500,29 +793,231 @@ def process_natural_language_query(
 
         return {
             **result,
-            "database": {
-                "id": connection.id,
-                "name": connection.name,
-                "type": connection.db_type,
-            },
+            "database": _database_info(connection),
         }
 
-    except SQLDatabaseConnection.DoesNotExist:
-        return {
-            "success": False,
-            "error": f"Database connection not found: {database_id}",
-        }
-    except ValueError as e:
-        return {
-            "success": False,
-            "error": str(e),
-        }
     except Exception as e:
-        logger.error(f"Error processing AI query: {e}", exc_info=True)
-        return {
-            "success": False,
-            "error": str(e),
-        }
+        return _ai_query_error(e, database_id, mcp_request)
+
+
+def stream_natural_language_query(
+    user_query: str,
+    database_id: int,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of process_natural_language_query
+
+    Returns an iterator over the events of SQLAIAgent.query_stream; the final
+    "done" event's response is the dict process_natural_language_query would
+    return. The connection lookup and agent setup run before this returns, so
+    iterating only waits on the agent's worker thread (safe off the request thread).
+    """
+    mcp_request = _build_ai_request(user_query, database_id, session_id, user_id)
+    try:
+        connection = _get_ai_connection(database_id)
+        agent = SQLAIAgent(connection, use_cache=True)
+    except Exception as e:
+        return iter([{"type": "done", "response": _ai_query_error(e, database_id, mcp_request)}])
+
+    return _with_database_info(agent.query_stream(user_query, mcp_request), connection)
+
+
+def _with_database_info(
+    events: Iterator[Dict[str, Any]],
+    connection: SQLDatabaseConnection,
+) -> Iterator[Dict[str, Any]]:
+    """Add the database info to the response of the final "done" event"""
+    for event in events:
+        if event["type"] == "done":
+            event = {
+                "type": "done",
+                "response": {**event["response"], "database": _database_info(connection)},
+            }
+        yield event
+
+
+def _get_ai_connection(database_id: int) -> SQLDatabaseConnection:
+    """Fetch the active connection with only the columns SQLAIAgent reads"""
+    # updated_at is part of the agent cache version
+    return SQLDatabaseConnection.objects.only(
+        "id",
+        "name",
+        "db_type",
+        "database_uri",
+        "sample_rows_in_table_info",
+        "include_tables",
+        "updated_at",
+    ).get(id=database_id, is_active=True)
+
+
+def _coalesce_tokens(events: "queue.Queue[Dict[str, Any]]") -> Iterator[Dict[str, Any]]:
+    """
+    Read stream events from the queue, merging runs of token events
+
+    Keeps time to first token (the first token is flushed on its own) while
+    long answers cross the HTTP boundary in a few larger frames instead of
+    one frame per token. Stops after the "done" event.
+    """
+    batch_size = 1
+    pending = None
+
+    while True:
+        event = pending if pending is not None else events.get()
+        pending = None
+
+        if event["type"] != "token":
+            yield event
+            if event["type"] == "done":
+                return
+            continue
+
+        texts = [event["text"]]
+        deadline = time.monotonic() + STREAM_FLUSH_INTERVAL
+        while len(texts) < batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                event = events.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if event["type"] != "token":
+                pending = event
+                break
+            texts.append(event["text"])
+
+        yield {"type": "token", "text": "".join(texts)}
+        batch_size = min(batch_size * STREAM_BATCH_GROWTH_FACTOR, STREAM_MAX_BATCH_SIZE)
+
+
+def _build_ai_request(
+    user_query: str,
+    database_id: int,
+    session_id: Optional[str],
+    user_id: Optional[str],
+) -> OpenAIMCPRequest:
+    """
+    Build the (unsaved) MCP request record an AI query is tracked under
+
+    SQLAIAgent saves it together with the execution record once the query
+    finishes, so an AI query costs a single commit.
+    """
+    return OpenAIMCPRequest(
+        jsonrpc="2.0",
+        method="ai_query",
+        params={"user_query": user_query, "database_id": database_id},
+        request_id=generate_request_id("ai_query"),
+        session_id=session_id,
+        user_id=user_id,
+        raw_request={"user_query": user_query, "database_id": database_id},
+    )
+
+
+def _database_info(connection: SQLDatabaseConnection) -> Dict[str, Any]:
+    return {
+        "id": connection.id,
+        "name": connection.name,
+        "type": connection.db_type,
+    }
+
+
+def _ai_query_error(
+    error: Exception,
+    database_id: int,
+    mcp_request: Optional[OpenAIMCPRequest] = None,
+) -> Dict[str, Any]:
+    """
+    Build the error response for an AI query that failed before/outside the agent run
+
+    The (still unsaved) request is stored with an error response so the failed
+    query leaves an audit row.
+    """
+    if isinstance(error, SQLDatabaseConnection.DoesNotExist):
+        message = f"Database connection not found: {database_id}"
+        code = MCP_ERROR_CODES["INVALID_PARAMS"]
+    elif isinstance(error, ValueError):
+        message = str(error)
+        code = MCP_ERROR_CODES["INVALID_PARAMS"]
+    else:
+        logger.error("Error processing AI query: %s", error, exc_info=error)
+        message = str(error)
+        code = MCP_ERROR_CODES["INTERNAL_ERROR"]
+
+    if mcp_request is not None and mcp_request.pk is None:
+        error_obj = create_mcp_error_response(code, message)
+        try:
+            with transaction.atomic():
+                mcp_request.save()
+                OpenAIMCPResponse.objects.create(
+                    request=mcp_request,
+                    error=error_obj,
+                    response_id=mcp_request.request_id,
+                    status="error",
+                    raw_response={"jsonrpc": "2.0", "id": mcp_request.request_id, "error": error_obj},
+                )
+        except Exception as e:
+            logger.warning("Could not record failed AI query: %s", e)
+
+    return {
+        "success": False,
+        "error": message,
+    }
+
+
+def _process_query_in_worker(*args, **kwargs) -> Dict[str, Any]:
+    """Run process_natural_language_query in a worker thread and release its DB connection"""
+    try:
+        return process_natural_language_query(*args, **kwargs)
+    finally:
+        # close_old_connections() keeps a healthy connection open for CONN_MAX_AGE
+        connections.close_all()
+
+
+async def aprocess_natural_language_query(
+    user_query: str,
+    database_id: int,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of process_natural_language_query
+
+    The query runs in its own worker thread (not Django's shared sync thread),
+    so the event loop and other queries keep running while it waits on the LLM
+    and the database.
+    """
+    return await sync_to_async(_process_query_in_worker, thread_sensitive=False)(
+        user_query,
+        database_id,
+        session_id=session_id,
+        user_id=user_id,
+    )
+
+
+async def aprocess_natural_language_queries(
+    user_queries: List[str],
+    database_id: int,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Process several natural language queries concurrently
+
+    Args:
+        user_queries: List of natural language queries
+        database_id: ID of database connection to use
+        session_id: Optional session ID for tracking
+        user_id: Optional user ID for tracking
+
+    Returns:
+        List of results in the same order as user_queries
+    """
+    return await asyncio.gather(*[
+        aprocess_natural_language_query(user_query, database_id, session_id, user_id)
+        for user_query in user_queries
+    ])
 
 
 def clear_agent_cache(database_id: Optional[int] = None):
@@ -536,12 +1031,50 @@ def clear_agent_cache(database_id: Optional[int] = None):
     with _cache_lock:
         if database_id:
             # Clear specific database cache
-            keys_to_remove = [k for k in _agent_cache.keys() if k.startswith(f"{database_id}_")]
-            for key in keys_to_remove:
-                del _agent_cache[key]
-            logger.info(f"Cleared agent cache for database {database_id}")
+            _agent_cache.pop(database_id, None)
+            logger.info("Cleared agent cache for database %s", database_id)
         else:
             # Clear all cache
             _agent_cache.clear()
             logger.info("Cleared all agent cache")
 
+    # Reflected schemas are shared between agents; drop them so changes are picked up
+    get_sql_database.cache_clear()
+
+
+def warm_agent_cache() -> None:
+    """
+    Build agents for the connections listed in settings.MCP_WARM_AGENT_CONNECTIONS
+
+    Runs once at startup so the first query against those databases does not pay
+    for schema reflection and agent construction.
+    """
+    names = getattr(settings, 'MCP_WARM_AGENT_CONNECTIONS', [])
+    if not names or not is_openai_configured():
+        return
+
+    try:
+        warm_connections = list(SQLDatabaseConnection.objects.filter(is_active=True, name__in=names))
+        for connection in warm_connections:
+            # One unreachable database should not stop the rest from warming
+            try:
+                SQLAIAgent(connection, use_cache=True)
+                logger.info("Warmed agent cache for database %s", connection.id)
+            except Exception as e:
+                logger.warning("Agent warmup failed for database %s: %s", connection.id, e)
+    except Exception as e:
+        logger.warning("Agent warmup skipped: %s", e)
+    finally:
+        # Runs in its own short-lived thread; don't leave its DB connection open
+        connections.close_all()
+
+
+def start_agent_warmup() -> None:
+    """
+    Warm the agent cache in a background thread if MCP_WARM_AGENT_CONNECTIONS is set
+
+    Called from the ASGI/WSGI entry points rather than AppConfig.ready(), so
+    management commands (migrate, collectstatic, shell, tests) never warm.
+    """
+    if getattr(settings, 'MCP_WARM_AGENT_CONNECTIONS', []):
+        threading.Thread(target=warm_agent_cache, name='mcp-agent-warmup', daemon=True).start()
@@ -0,0 +1,19 @@
+"""
+Fast JSON encoder for model JSONFields
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+import orjson
+
+
+class ORJSONEncoder(DjangoJSONEncoder):
+    """
+    Encode JSONField values with orjson instead of the stdlib json module
+
+    Types orjson does not handle natively (Decimal, lazy strings, timedelta)
+    fall back to DjangoJSONEncoder.default.
+    """
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def encode(self, o):
+        return orjson.dumps(o, default=self.default, option=self.options).decode("utf-8")
@@ -4,6 +4,7 @@ Creates real tool schemas for LangChain SQL Toolkit
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from mcp.models import MCPToolSchema
 
 
@@ -104,31 +105,50 @@ class Command(BaseCommand):
             }
         ]
 
-        created_count = 0
-        updated_count = 0
+        names = [schema_data["name"] for schema_data in schemas]
 
-        for schema_data in schemas:
-            tool, created = MCPToolSchema.objects.update_or_create(
-                name=schema_data["name"],
-                defaults={
-                    "description": schema_data["description"],
-                    "category": schema_data["category"],
-                    "langchain_tool_class": schema_data["langchain_tool_class"],
-                    "input_schema": schema_data["input_schema"],
-                    "output_schema": schema_data["output_schema"],
-                    "is_active": True,
-                }
+        # Upsert every schema in one INSERT ... ON CONFLICT (name) DO UPDATE
+        with transaction.atomic():
+            existing = set(MCPToolSchema.objects.filter(name__in=names).values_list("name", flat=True))
+            MCPToolSchema.objects.bulk_create(
+                [
+                    MCPToolSchema(
+                        name=schema_data["name"],
+                        description=schema_data["description"],
+                        category=schema_data["category"],
+                        langchain_tool_class=schema_data["langchain_tool_class"],
+                        input_schema=schema_data["input_schema"],
+                        output_schema=schema_data["output_schema"],
+                        is_active=True,
+                    )
+                    for schema_data in schemas
+                ],
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=[
+                    "description",
+                    "category",
+                    "langchain_tool_class",
+                    "input_schema",
+                    "output_schema",
+                    "is_active",
+                    "updated_at",
+                ],
             )
 
-            if created:
+        created_count = 0
+        updated_count = 0
+
+        for name in names:
+            if name not in existing:
                 created_count += 1
                 self.stdout.write(
-                    self.style.SUCCESS(f'✅ Created: {schema_data["name"]}')
+                    self.style.SUCCESS(f'✅ Created: {name}')
                 )
             else:
                 updated_count += 1
                 self.stdout.write(
-                    self.style.WARNING(f'⚠️  Updated: {schema_data["name"]}')
+                    self.style.WARNING(f'⚠️  Updated: {name}')
                 )
 
         self.stdout.write(
@@ -1,11 +1,324 @@
-import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connection, transaction
 from django.utils import timezone
 from mcp.models import Transaction
+import io
+import itertools
 import os
 from pathlib import Path
-import pytz
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import queue
+import threading
+
+# Rows per INSERT statement issued by bulk_create
+INSERT_BATCH_SIZE = 1000
+
+# Batches read and prepared ahead of the one being inserted
+READ_AHEAD_BATCHES = 2
+
+# Transaction fields filled from the Parquet columns of the same name
+FIELDS = (
+    'transaction_id',
+    'transaction_timestamp',
+    'card_id',
+    'expiry_date',
+    'issuer_bank_name',
+    'merchant_id',
+    'merchant_mcc',
+    'mcc_category',
+    'merchant_city',
+    'transaction_type',
+    'transaction_amount_kzt',
+    'original_amount',
+    'transaction_currency',
+    'acquirer_country_iso',
+    'pos_entry_mode',
+    'wallet_type',
+)
+
+# Missing values become 0 / '' except in the nullable columns
+INTEGER_COLUMNS = ('card_id', 'merchant_id', 'merchant_mcc')
+STRING_COLUMNS = (
+    'expiry_date',
+    'issuer_bank_name',
+    'mcc_category',
+    'merchant_city',
+    'transaction_type',
+    'transaction_currency',
+    'acquirer_country_iso',
+    'pos_entry_mode',
+)
+
+
+def _extract_columns(record_batch):
+    """
+    Convert Arrow columns to lists of Python values, one pass per column
+
+    Args:
+        record_batch: pyarrow RecordBatch read from the Parquet file
+
+    Returns:
+        Dict of field name -> list of values ready for the Transaction model
+    """
+    def column(name, type_, fill=None):
+        values = record_batch.column(name)
+        # pandas writes nullable integer columns as float with NaN; treat NaN as missing
+        if pa.types.is_floating(values.type):
+            values = pc.if_else(pc.is_nan(values), pa.scalar(None, values.type), values)
+        if fill is not None:
+            values = pc.fill_null(values, fill)
+        return values.cast(type_, safe=False)
+
+    columns = {
+        'transaction_id': column('transaction_id', pa.string()).to_pylist(),
+        'transaction_amount_kzt': column('transaction_amount_kzt', pa.float64(), 0.0).to_pylist(),
+        'original_amount': column('original_amount', pa.float64()).to_pylist(),
+        'wallet_type': column('wallet_type', pa.string()).to_pylist(),
+    }
+    for name in INTEGER_COLUMNS:
+        columns[name] = column(name, pa.int64(), 0).to_pylist()
+    for name in STRING_COLUMNS:
+        columns[name] = column(name, pa.string(), '').to_pylist()
+
+    # Naive timestamps are UTC; casting the whole column yields timezone-aware datetimes
+    timestamps = record_batch.column('transaction_timestamp')
+    if timestamps.type.tz is None:
+        timestamps = timestamps.cast(pa.timestamp(timestamps.type.unit, tz='UTC'))
+    columns['transaction_timestamp'] = timestamps.to_pylist()
+    return columns
+
+
+def _drop_indexes():
+    """
+    Drop the secondary indexes of the transactions table (PostgreSQL)
+
+    Indexes backing constraints (primary key, unique transaction_id) are kept
+    so conflicts are still detected during the load.
+
+    Returns:
+        List of (index name, CREATE INDEX statement) to restore them with
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(i.oid)
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+            """,
+            [Transaction._meta.db_table],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    return indexes
+
+
+def _create_indexes(indexes):
+    """Recreate indexes dropped by _drop_indexes"""
+    with connection.cursor() as cursor:
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+
+def _drop_invalid_rows(record_batch):
+    """
+    Remove rows missing a transaction_id or timestamp (both are required)
+
+    Args:
+        record_batch: pyarrow RecordBatch read from the Parquet file
+
+    Returns:
+        Tuple of (filtered RecordBatch, number of rows dropped)
+    """
+    valid = pc.and_(
+        pc.is_valid(record_batch.column('transaction_id')),
+        pc.is_valid(record_batch.column('transaction_timestamp')),
+    )
+    filtered = record_batch.filter(valid)
+    return filtered, record_batch.num_rows - filtered.num_rows
+
+
+def _iter_record_batches(parquet, batch_size, limit=None):
+    """
+    Yield RecordBatches of at most batch_size rows, stopping after limit rows
+
+    Args:
+        parquet: pyarrow ParquetFile
+        batch_size: Rows per batch
+        limit: Optional total row limit
+    """
+    if limit is not None:
+        batch_size = max(1, min(batch_size, limit))
+
+    # Only the columns the model uses are read and decompressed
+    remaining = limit
+    for record_batch in parquet.iter_batches(batch_size=batch_size, columns=list(FIELDS)):
+        if remaining is not None:
+            if remaining <= 0:
+                return
+            record_batch = record_batch.slice(0, remaining)
+            remaining -= record_batch.num_rows
+        yield record_batch
+
+
+def _copy_text(value):
+    """Format a value for PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return (
+            value.replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r')
+        )
+    return str(value)
+
+
+def _copy_rows(columns):
+    """
+    Insert extracted columns with PostgreSQL COPY FROM STDIN
+
+    Unlike bulk_create(ignore_conflicts=True), a duplicate transaction_id
+    aborts the whole COPY.
+
+    Args:
+        columns: Dict of field name -> list of values (from _extract_columns)
+    """
+    now = _copy_text(timezone.now())
+    buffer = io.StringIO()
+    for values in zip(*(columns[field] for field in FIELDS)):
+        buffer.write('\t'.join(map(_copy_text, values)))
+        buffer.write(f'\t{now}\t{now}\n')
+    buffer.seek(0)
+
+    column_list = ', '.join(FIELDS + ('created_at', 'updated_at'))
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {Transaction._meta.db_table} ({column_list}) FROM STDIN', buffer)
+
+
+def _build_transactions(columns, row_count):
+    """
+    Build unsaved Transaction instances from extracted columns
+
+    Values are passed positionally in concrete field order, which takes the
+    fast path of Model.__init__ (no keyword lookups per field). Fields not read
+    from Parquet (id, created_at, updated_at) are None and filled on insert.
+
+    Args:
+        columns: Dict of field name -> list of values (from _extract_columns)
+        row_count: Number of rows in columns
+
+    Returns:
+        List of Transaction instances
+    """
+    ordered = [
+        columns[field.attname] if field.attname in columns else itertools.repeat(None, row_count)
+        for field in Transaction._meta.concrete_fields
+    ]
+    return [Transaction(*values) for values in zip(*ordered)]
+
+
+def _convert_batch(record_batch, build_objects=True):
+    """Extract columns (and Transaction instances if build_objects) from a RecordBatch"""
+    columns = _extract_columns(record_batch)
+    batch = _build_transactions(columns, record_batch.num_rows) if build_objects else None
+    return columns, batch
+
+
+def _drop_unconvertible_rows(record_batch, build_objects=True):
+    """
+    Remove rows that fail conversion on their own (slow; only used after a batch fails)
+
+    Returns:
+        Tuple of (filtered RecordBatch, number of rows dropped)
+    """
+    keep = []
+    for row in range(record_batch.num_rows):
+        try:
+            _convert_batch(record_batch.slice(row, 1), build_objects)
+        except Exception:
+            continue
+        keep.append(row)
+    return record_batch.take(pa.array(keep, type=pa.int64())), record_batch.num_rows - len(keep)
+
+
+def _prepare_batches(parquet, batch_size, limit=None, build_objects=True):
+    """
+    Read, validate and convert Parquet batches (no database access)
+
+    Args:
+        parquet: pyarrow ParquetFile
+        batch_size: Rows per batch
+        limit: Optional total row limit
+        build_objects: Whether to build Transaction instances (needed for bulk_create)
+
+    Yields:
+        Tuples of (first row, next row, invalid row count, unconvertible row count,
+        conversion error or None, columns, Transaction list or None)
+    """
+    row_offset = 0
+    for record_batch in _iter_record_batches(parquet, batch_size, limit):
+        batch_start = row_offset
+        row_offset += record_batch.num_rows
+
+        record_batch, invalid_count = _drop_invalid_rows(record_batch)
+        failed_count, error = 0, None
+        try:
+            columns, batch = _convert_batch(record_batch, build_objects)
+        except Exception as e:
+            # Only the rows that cannot be converted are skipped, not the whole batch
+            record_batch, failed_count = _drop_unconvertible_rows(record_batch, build_objects)
+            error = e
+            columns, batch = _convert_batch(record_batch, build_objects)
+        yield batch_start, row_offset, invalid_count, failed_count, error, columns, batch
+
+
+def _read_ahead(items, depth=READ_AHEAD_BATCHES):
+    """
+    Iterate items in a background thread, keeping up to depth results ready
+
+    Lets the next batch be read and built while the current one is inserted.
+    Exceptions raised by the iterator are re-raised in the caller.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        # Give up once the consumer has stopped so the thread can exit
+        while not stop.is_set():
+            try:
+                ready.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((True, item)):
+                    return
+        except Exception as e:
+            put((False, e))
+            return
+        put((False, None))
+
+    threading.Thread(target=produce, name='load-transactions-reader', daemon=True).start()
+    try:
+        while True:
+            has_item, value = ready.get()
+            if not has_item:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        stop.set()
 
 
 class Command(BaseCommand):
@@ -35,12 +348,27 @@ class Command(BaseCommand):
             default=None,
             help='Limit the number of records to load (for testing purposes)'
         )
+        parser.add_argument(
+            '--engine',
+            choices=['orm', 'copy'],
+            default='orm',
+            help='Insert with bulk_create (orm, skips duplicates) or PostgreSQL COPY '
+                 '(copy, much faster but fails on duplicate transaction_id; use with --clear)'
+        )
+        parser.add_argument(
+            '--drop-indexes',
+            action='store_true',
+            help='Drop secondary indexes during the load and rebuild them at the end '
+                 '(PostgreSQL only; the table is locked until the load finishes)'
+        )
 
     def handle(self, *args, **options):
         batch_size = options['batch_size']
         clear = options['clear']
         file_path = options['file']
         limit = options['limit']
+        engine = options['engine']
+        drop_indexes = options['drop_indexes']
 
         # Resolve file path
         project_root = Path(__file__).resolve().parent.parent.parent.parent.parent
@@ -49,6 +377,11 @@ class Command(BaseCommand):
         if not parquet_file.exists():
             raise CommandError(f'Parquet file not found: {parquet_file}')
 
+        if engine == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('--engine=copy requires a PostgreSQL database')
+        if drop_indexes and connection.vendor != 'postgresql':
+            raise CommandError('--drop-indexes requires a PostgreSQL database')
+
         self.stdout.write(self.style.SUCCESS(f'Loading data from: {parquet_file}'))
 
         # Clear existing data if requested
@@ -58,17 +391,17 @@ class Command(BaseCommand):
             Transaction.objects.all().delete()
             self.stdout.write(self.style.SUCCESS(f'Deleted {count} existing transactions'))
 
-        # Load Parquet file
+        # Open Parquet file (rows are streamed batch by batch, not loaded at once)
         self.stdout.write('Reading Parquet file...')
         try:
-            df = pd.read_parquet(parquet_file)
-            
+            parquet = pq.ParquetFile(parquet_file)
+            total_records = parquet.metadata.num_rows
+
             if limit:
-                df = df.head(limit)
+                total_records = min(total_records, limit)
                 self.stdout.write(self.style.WARNING(f'Limited to {limit} records for testing'))
-            
-            total_records = len(df)
-            self.stdout.write(self.style.SUCCESS(f'Loaded {total_records:,} records from Parquet file'))
+
+            self.stdout.write(self.style.SUCCESS(f'Found {total_records:,} records in Parquet file'))
         except Exception as e:
             raise CommandError(f'Error reading Parquet file: {e}')
 
@@ -77,65 +410,60 @@ class Command(BaseCommand):
         
         inserted_count = 0
         skipped_count = 0
-        batch = []
 
-        for idx, row in df.iterrows():
-            try:
-                # Convert timestamp to timezone-aware datetime
-                ts = row['transaction_timestamp']
-                if pd.notna(ts):
-                    # Make timezone-aware using UTC
-                    ts = timezone.make_aware(ts.to_pydatetime(), timezone=pytz.UTC) if ts.tzinfo is None else ts
-                
-                # Create Transaction object
-                transaction_obj = Transaction(
-                    transaction_id=str(row['transaction_id']),
-                    transaction_timestamp=ts,
-                    card_id=int(row['card_id']) if pd.notna(row['card_id']) else 0,
-                    expiry_date=str(row['expiry_date']) if pd.notna(row['expiry_date']) else '',
-                    issuer_bank_name=str(row['issuer_bank_name']) if pd.notna(row['issuer_bank_name']) else '',
-                    merchant_id=int(row['merchant_id']) if pd.notna(row['merchant_id']) else 0,
-                    merchant_mcc=int(row['merchant_mcc']) if pd.notna(row['merchant_mcc']) else 0,
-                    mcc_category=str(row['mcc_category']) if pd.notna(row['mcc_category']) else '',
-                    merchant_city=str(row['merchant_city']) if pd.notna(row['merchant_city']) else '',
-                    transaction_type=str(row['transaction_type']) if pd.notna(row['transaction_type']) else '',
-                    transaction_amount_kzt=float(row['transaction_amount_kzt']) if pd.notna(row['transaction_amount_kzt']) else 0.0,
-                    original_amount=float(row['original_amount']) if pd.notna(row['original_amount']) else None,
-                    transaction_currency=str(row['transaction_currency']) if pd.notna(row['transaction_currency']) else '',
-                    acquirer_country_iso=str(row['acquirer_country_iso']) if pd.notna(row['acquirer_country_iso']) else '',
-                    pos_entry_mode=str(row['pos_entry_mode']) if pd.notna(row['pos_entry_mode']) else '',
-                    wallet_type=str(row['wallet_type']) if pd.notna(row['wallet_type']) else None,
-                )
-                batch.append(transaction_obj)
-                
-                # Insert batch when it reaches batch_size
-                if len(batch) >= batch_size:
+        # Reading and building the next batches overlaps with inserting the current one
+        prepared = _read_ahead(_prepare_batches(parquet, batch_size, limit, build_objects=engine == 'orm'))
+
+        # One transaction for the whole load instead of a commit per batch
+        with transaction.atomic():
+            # Dropping inside the load transaction means a failed load restores the indexes too
+            dropped_indexes = _drop_indexes() if drop_indexes else []
+            if dropped_indexes:
+                self.stdout.write(self.style.WARNING(f'Dropped {len(dropped_indexes)} indexes for the load'))
+
+            for batch_start, row_offset, invalid_count, failed_count, error, columns, batch in prepared:
+                if invalid_count:
+                    skipped_count += invalid_count
+                    self.stdout.write(self.style.ERROR(
+                        f'Skipped {invalid_count:,} rows without transaction_id/timestamp in batch at row {batch_start}'
+                    ))
+                if failed_count:
+                    skipped_count += failed_count
+                    self.stdout.write(self.style.ERROR(
+                        f'Skipped {failed_count:,} rows that failed conversion in batch at row {batch_start}: {error}'
+                    ))
+
+                row_count = len(columns['transaction_id'])
+
+                try:
+                    # Savepoint, not a commit: a failed batch is rolled back on its own
                     with transaction.atomic():
-                        Transaction.objects.bulk_create(batch, ignore_conflicts=True)
-                    inserted_count += len(batch)
-                    batch = []
-                    
-                    # Progress indicator
-                    progress = (inserted_count / total_records) * 100
-                    self.stdout.write(
-                        f'Progress: {inserted_count:,}/{total_records:,} ({progress:.1f}%)',
-                        ending='\r'
-                    )
-                    self.stdout.flush()
-                    
-            except Exception as e:
-                skipped_count += 1
-                if skipped_count <= 10:  # Only show first 10 errors
-                    self.stdout.write(self.style.ERROR(f'Error processing row {idx}: {e}'))
-
-        # Insert remaining batch
-        if batch:
-            try:
-                with transaction.atomic():
-                    Transaction.objects.bulk_create(batch, ignore_conflicts=True)
-                inserted_count += len(batch)
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'Error inserting final batch: {e}'))
+                        if batch is None:
+                            _copy_rows(columns)
+                        else:
+                            Transaction.objects.bulk_create(batch, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True)
+                    inserted_count += row_count
+                except Exception as e:
+                    skipped_count += row_count
+                    self.stdout.write(self.style.ERROR(f'Error inserting batch at row {batch_start}: {e}'))
+
+                # Progress indicator
+                progress = (row_offset / total_records) * 100
+                self.stdout.write(
+                    f'Progress: {inserted_count:,}/{total_records:,} ({progress:.1f}%)',
+                    ending='\r'
+                )
+                self.stdout.flush()
+
+            if dropped_indexes:
+                self.stdout.write('')  # New line after progress indicator
+                self.stdout.write(f'Rebuilding {len(dropped_indexes)} indexes...')
+                _create_indexes(dropped_indexes)
+
+        # Refresh planner statistics after the bulk load so index scans are chosen
+        if inserted_count:
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Transaction._meta.db_table}')
 
         # Final summary
         self.stdout.write('')  # New line after progress indicator
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2025-11-20 10:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0002_load_sample_transactions'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['merchant_city', '-transaction_timestamp'], name='mcp_txn_city_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', '-transaction_timestamp'], name='mcp_txn_type_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['transaction_timestamp'], name='mcp_txn_ts_brin', pages_per_range=32),
+        ),
+        # Refresh planner statistics so the new indexes are picked up right away
+        migrations.RunSQL('ANALYZE mcp_transactions', reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2025-11-21 09:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0003_transaction_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='openaimcpresponse',
+            index=models.Index(fields=['-created_at'], name='mcp_response_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='sqltoolexecution',
+            index=models.Index(fields=['-created_at'], name='sql_tool_exec_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='mcprequestlog',
+            index=models.Index(fields=['-created_at'], name='mcp_req_log_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['mcc_category', 'merchant_city'], name='mcp_txn_mcc_city_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_currency'], name='mcp_txn_currency_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2025-11-21 12:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0005_transaction_search_trigram'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='mcpsession',
+            index=models.Index(fields=['-last_activity'], name='mcp_session_activity_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='mcpsession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-last_activity'], name='mcp_session_active_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2025-11-22 10:18
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0006_mcpsession_activity_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='openaimcprequest',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('request_id'), name='text_pattern_ops'), name='mcp_req_id_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='openaimcprequest',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('session_id'), name='text_pattern_ops'), name='mcp_req_session_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='openaimcprequest',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('user_id'), name='text_pattern_ops'), name='mcp_req_user_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='openaimcprequest',
+            index=models.Index(django.db.models.functions.text.Upper('method'), name='mcp_req_method_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='openaimcpresponse',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('response_id'), name='text_pattern_ops'), name='mcp_resp_id_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2025-11-22 12:02
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0007_admin_search_prefix_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sqltoolexecution',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('sql_query'), name='gin_trgm_ops'), name='sql_tool_exec_sql_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='mcprequestlog',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('sql_query'), name='gin_trgm_ops'), name='mcp_req_log_sql_trgm'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2025-11-22 14:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0008_sql_query_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='openaimcpresponse',
+            index=models.Index(fields=['status', '-created_at'], name='mcp_response_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='sqltoolexecution',
+            index=models.Index(fields=['status', '-created_at'], name='sql_tool_exec_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='mcprequestlog',
+            index=models.Index(fields=['function_name', '-created_at'], name='mcp_req_log_function_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2025-11-23 10:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('mcp', '0009_admin_filter_ordering_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sqltoolexecution',
+            index=models.Index(fields=['mcp_request', '-created_at'], name='sql_tool_exec_request_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2025-11-24 09:15
+
+from django.db import migrations, models
+import mcp.encoders
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mcp', '0010_sqltoolexecution_request_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sqltoolexecution',
+            name='tool_output',
+            field=models.JSONField(blank=True, encoder=mcp.encoders.ORJSONEncoder, help_text='Tool execution result', null=True),
+        ),
+        migrations.AlterField(
+            model_name='sqltoolexecution',
+            name='query_result',
+            field=models.JSONField(blank=True, encoder=mcp.encoders.ORJSONEncoder, help_text='SQL query results', null=True),
+        ),
+    ]
@@ -1,4 +1,8 @@
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+
+from .encoders import ORJSONEncoder
 
 
 # ============================================
@@ -30,6 +34,11 @@ class OpenAIMCPRequest(models.Model):
         indexes = [
             models.Index(fields=["-created_at", "method"]),
             models.Index(fields=["session_id", "-created_at"]),
+            # Admin search: istartswith/iexact compile to UPPER(col) LIKE 'X%' / = 'X'
+            models.Index(OpClass(Upper("request_id"), name="text_pattern_ops"), name="mcp_req_id_upper_idx"),
+            models.Index(OpClass(Upper("session_id"), name="text_pattern_ops"), name="mcp_req_session_upper_idx"),
+            models.Index(OpClass(Upper("user_id"), name="text_pattern_ops"), name="mcp_req_user_upper_idx"),
+            models.Index(Upper("method"), name="mcp_req_method_upper_idx"),
         ]
 
     def __str__(self):
@@ -75,6 +84,11 @@ class OpenAIMCPResponse(models.Model):
     class Meta:
         db_table = "openai_mcp_response"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="mcp_response_created_idx"),
+            models.Index(fields=["status", "-created_at"], name="mcp_response_status_idx"),
+            models.Index(OpClass(Upper("response_id"), name="text_pattern_ops"), name="mcp_resp_id_upper_idx"),
+        ]
 
     def __str__(self):
         return f"Response to {self.request.method} - {self.status}"
@@ -155,11 +169,11 @@ class SQLToolExecution(models.Model):
 
     # Input/Output
     tool_input = models.JSONField(help_text="Input parameters for the tool")
-    tool_output = models.JSONField(blank=True, null=True, help_text="Tool execution result")
+    tool_output = models.JSONField(blank=True, null=True, encoder=ORJSONEncoder, help_text="Tool execution result")
 
     # SQL query details (for query tools)
     sql_query = models.TextField(blank=True, null=True, help_text="Generated or checked SQL query")
-    query_result = models.JSONField(blank=True, null=True, help_text="SQL query results")
+    query_result = models.JSONField(blank=True, null=True, encoder=ORJSONEncoder, help_text="SQL query results")
 
     # Execution metadata
     status = models.CharField(
@@ -184,6 +198,12 @@ class SQLToolExecution(models.Model):
         indexes = [
             models.Index(fields=["tool_name", "-created_at"]),
             models.Index(fields=["database", "-created_at"]),
+            models.Index(fields=["-created_at"], name="sql_tool_exec_created_idx"),
+            models.Index(fields=["status", "-created_at"], name="sql_tool_exec_status_idx"),
+            # Executions of one MCP request, newest first (request admin inline)
+            models.Index(fields=["mcp_request", "-created_at"], name="sql_tool_exec_request_idx"),
+            # Admin icontains search on the stored SQL
+            GinIndex(OpClass(Upper("sql_query"), name="gin_trgm_ops"), name="sql_tool_exec_sql_trgm"),
         ]
 
     def __str__(self):
@@ -222,6 +242,11 @@ class MCPRequestLog(models.Model):
     class Meta:
         db_table = "mcp_request_log"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="mcp_req_log_created_idx"),
+            models.Index(fields=["function_name", "-created_at"], name="mcp_req_log_function_idx"),
+            GinIndex(OpClass(Upper("sql_query"), name="gin_trgm_ops"), name="mcp_req_log_sql_trgm"),
+        ]
 
     def __str__(self):
         return f"{self.function_name} at {self.created_at}"
@@ -317,6 +342,15 @@ class MCPSession(models.Model):
     class Meta:
         db_table = "mcp_session"
         ordering = ["-last_activity"]
+        indexes = [
+            models.Index(fields=["-last_activity"], name="mcp_session_activity_idx"),
+            # Admin default view: active sessions, most recent first
+            models.Index(
+                fields=["-last_activity"],
+                name="mcp_session_active_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Session {self.session_id} - {self.user_id or 'Anonymous'}"
@@ -434,6 +468,19 @@ class Transaction(models.Model):
             models.Index(fields=['merchant_id', 'transaction_timestamp']),
             models.Index(fields=['issuer_bank_name', 'transaction_timestamp']),
             models.Index(fields=['mcc_category', 'transaction_timestamp']),
+            # Common filters in LLM-generated queries (city/type + recent first)
+            models.Index(fields=['merchant_city', '-transaction_timestamp'], name='mcp_txn_city_ts_idx'),
+            models.Index(fields=['transaction_type', '-transaction_timestamp'], name='mcp_txn_type_ts_idx'),
+            # Admin list_filter columns not covered above
+            models.Index(fields=['mcc_category', 'merchant_city'], name='mcp_txn_mcc_city_idx'),
+            models.Index(fields=['transaction_currency'], name='mcp_txn_currency_idx'),
+            # Rows are appended in time order, so a tiny BRIN index covers date range scans
+            BrinIndex(fields=['transaction_timestamp'], name='mcp_txn_ts_brin', pages_per_range=32),
+            # Trigram indexes on UPPER(col) match the admin's icontains search SQL
+            GinIndex(OpClass(Upper('transaction_id'), name='gin_trgm_ops'), name='mcp_txn_id_trgm'),
+            GinIndex(OpClass(Upper('issuer_bank_name'), name='gin_trgm_ops'), name='mcp_txn_bank_trgm'),
+            GinIndex(OpClass(Upper('merchant_city'), name='gin_trgm_ops'), name='mcp_txn_city_trgm'),
+            GinIndex(OpClass(Upper('mcc_category'), name='gin_trgm_ops'), name='mcp_txn_mcc_trgm'),
         ]
         verbose_name = 'Transaction'
         verbose_name_plural = 'Transactions'
@@ -0,0 +1,269 @@
+"""
+Result cache for natural language AI queries
+Repeated or near-duplicate questions are answered from cache, skipping the LLM round-trip and SQL execution
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import logging
+import numpy as np
+import re
+import threading
+import time
+
+from .utils import get_openai_embeddings, is_openai_configured
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Numbers and quoted strings; near-duplicate questions must agree on these exactly
+_LITERAL_RE = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(?:[.,:/-]\d+)*")
+
+# In-process LRU in front of the shared cache (key -> (expires_at, response))
+LOCAL_CACHE_SIZE = 1024
+_local_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_local_lock = threading.Lock()
+
+# Embeddings of recently answered questions per (database, version, model) for similarity lookups
+# ((database_id, version, model) -> OrderedDict of key -> (expires_at, unit vector, literals))
+SEMANTIC_CACHE_SIZE = 256
+_semantic_index: Dict[Tuple[int, str, str], "OrderedDict[str, Tuple[float, np.ndarray, Tuple[str, ...]]]"] = {}
+_semantic_lock = threading.Lock()
+
+
+def normalize_query(user_query: str) -> str:
+    """
+    Normalize natural language query for cache lookups
+
+    Args:
+        user_query: Natural language query from user
+
+    Returns:
+        Lowercased query with collapsed whitespace
+    """
+    return _WHITESPACE_RE.sub(" ", user_query.strip().lower())
+
+
+def query_literals(user_query: str) -> Tuple[str, ...]:
+    """
+    Extract the numbers and quoted strings of a query
+
+    Questions differing only in a year, amount or ID embed almost identically,
+    so a semantic cache hit also requires these to match.
+    """
+    return tuple(_LITERAL_RE.findall(normalize_query(user_query)))
+
+
+class QueryResultCache:
+    """
+    Cache of AI query responses per database connection
+
+    Keys are a blake2b digest of the connection version, model name and
+    normalized query, values are the JSON-serializable response dicts
+    returned by SQLAIAgent.query.
+    Lookups hit a per-process LRU first, then Django's cache framework,
+    which is shared between workers when CACHES points at Redis/Memcached.
+
+    When similarity_threshold is set, an exact miss embeds the question and
+    compares it (cosine similarity) against recently answered questions for
+    the same database; a close enough match with the same literals (numbers,
+    quoted strings) returns that question's cached response.
+    """
+
+    key_prefix = "mcp:ai_query"
+
+    def __init__(
+        self,
+        database_id: int,
+        timeout: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        version: str = "",
+    ):
+        """
+        Args:
+            database_id: SQLDatabaseConnection ID the cached answers belong to
+            timeout: Entry TTL in seconds (default: settings.MCP_QUERY_CACHE_TTL, 0 disables)
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+                (default: settings.MCP_SEMANTIC_CACHE_THRESHOLD, 0 disables)
+            version: Connection config version; answers cached under another version are not served
+        """
+        self.database_id = database_id
+        self.version = version
+        self.timeout = timeout if timeout is not None else getattr(settings, "MCP_QUERY_CACHE_TTL", 0)
+        self.similarity_threshold = (
+            similarity_threshold
+            if similarity_threshold is not None
+            else getattr(settings, "MCP_SEMANTIC_CACHE_THRESHOLD", 0)
+        )
+        # Embedding of the last looked-up query, reused by set() to avoid a second API call
+        self._embedding: Optional[Tuple[str, np.ndarray]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.enabled and self.similarity_threshold > 0 and is_openai_configured()
+
+    def make_key(self, user_query: str) -> str:
+        # Model and connection version are part of the key so switching OPENAI_MODEL
+        # or editing the connection does not serve stale answers
+        model = getattr(settings, "OPENAI_MODEL", "")
+        payload = f"{self.version}\0{model}\0{normalize_query(user_query)}".encode("utf-8")
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return f"{self.key_prefix}:{self.database_id}:{digest}"
+
+    def get(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Return cached response for the query (or a near-duplicate of it) or None"""
+        if not self.enabled:
+            return None
+
+        response = self._get_key(self.make_key(user_query))
+        if response is None and self.semantic_enabled:
+            response = self._get_similar(user_query)
+        return response
+
+    def _get_key(self, key: str) -> Optional[Dict[str, Any]]:
+        response = _local_get(key)
+        if response is not None:
+            return response
+
+        try:
+            response = cache.get(key)
+        except Exception as e:
+            logger.warning("Query cache lookup failed: %s", e)
+            return None
+
+        if response is not None:
+            _local_set(key, response, self.timeout)
+        return response
+
+    def set(self, user_query: str, response: Dict[str, Any]) -> None:
+        """Store a successful response for the query"""
+        if not self.enabled:
+            return
+
+        key = self.make_key(user_query)
+        _local_set(key, response, self.timeout)
+
+        try:
+            cache.set(key, response, self.timeout)
+        except Exception as e:
+            logger.warning("Query cache store failed: %s", e)
+
+        if self.semantic_enabled:
+            vector = self._embed(user_query)
+            if vector is not None:
+                _semantic_add(self._index_key(), key, vector, query_literals(user_query), self.timeout)
+
+    def _index_key(self) -> Tuple[int, str, str]:
+        return self.database_id, self.version, getattr(settings, "OPENAI_MODEL", "")
+
+    def _get_similar(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response of the most similar recent question above the threshold"""
+        vector = self._embed(user_query)
+        if vector is None:
+            return None
+
+        key = _semantic_match(self._index_key(), vector, query_literals(user_query), self.similarity_threshold)
+        if key is None:
+            return None
+
+        logger.debug("Semantic cache hit for query: %s", user_query)
+        return self._get_key(key)
+
+    def _embed(self, user_query: str) -> Optional[np.ndarray]:
+        """Embed the normalized query as a unit vector (None if the API call fails)"""
+        normalized = normalize_query(user_query)
+        if self._embedding is not None and self._embedding[0] == normalized:
+            return self._embedding[1]
+
+        model = getattr(settings, "MCP_EMBEDDING_MODEL", "text-embedding-3-small")
+        try:
+            vector = np.asarray(get_openai_embeddings(model).embed_query(normalized), dtype=np.float32)
+        except Exception as e:
+            logger.warning("Query embedding failed: %s", e)
+            return None
+
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        vector /= norm
+        self._embedding = (normalized, vector)
+        return vector
+
+
+def _local_get(key: str) -> Optional[Dict[str, Any]]:
+    """Look up key in the in-process LRU, dropping it if expired"""
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _local_cache[key]
+            return None
+        _local_cache.move_to_end(key)
+        return entry[1]
+
+
+def _local_set(key: str, response: Dict[str, Any], timeout: int) -> None:
+    """Store response in the in-process LRU, evicting the least recently used entry"""
+    with _local_lock:
+        _local_cache[key] = (time.monotonic() + timeout, response)
+        _local_cache.move_to_end(key)
+        if len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+
+def _semantic_add(
+    index_key: Tuple[int, str, str],
+    key: str,
+    vector: np.ndarray,
+    literals: Tuple[str, ...],
+    timeout: int,
+) -> None:
+    """Remember the embedding of an answered question, evicting the oldest entry"""
+    with _semantic_lock:
+        entries = _semantic_index.get(index_key)
+        if entries is None:
+            # A new connection version/model replaces the database's older indexes
+            for stale_key in [k for k in _semantic_index if k[0] == index_key[0]]:
+                del _semantic_index[stale_key]
+            entries = _semantic_index[index_key] = OrderedDict()
+        entries[key] = (time.monotonic() + timeout, vector, literals)
+        entries.move_to_end(key)
+        if len(entries) > SEMANTIC_CACHE_SIZE:
+            entries.popitem(last=False)
+
+
+def _semantic_match(
+    index_key: Tuple[int, str, str],
+    vector: np.ndarray,
+    literals: Tuple[str, ...],
+    threshold: float,
+) -> Optional[str]:
+    """Return the cache key of the most similar unexpired question with the same literals, if above threshold"""
+    with _semantic_lock:
+        entries = _semantic_index.get(index_key)
+        if not entries:
+            return None
+
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _, _) in entries.items() if expires_at <= now]:
+            del entries[key]
+
+        keys = [key for key, (_, _, entry_literals) in entries.items() if entry_literals == literals]
+        if not keys:
+            return None
+        matrix = np.stack([entries[key][1] for key in keys])
+
+    # Vectors are unit length, so the dot product is the cosine similarity
+    scores = matrix @ vector
+    best = int(np.argmax(scores))
+    if scores[best] < threshold:
+        return None
+    return keys[best]
@@ -0,0 +1,33 @@
+"""
+Fast JSON renderer for Django REST Framework API responses
+"""
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+import orjson
+
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Render JSON with orjson instead of the stdlib json module
+
+    orjson encodes datetime, UUID and numpy values natively in C; other types
+    (Decimal, lazy strings, QuerySets) fall back to DRF's JSONEncoder.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        option = self.options
+        # Browsable API asks for indented output
+        if renderer_context and renderer_context.get("indent"):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=_fallback_encoder.default, option=option)
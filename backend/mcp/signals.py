@@ -0,0 +1,27 @@
+"""
+Signal handlers for the MCP application
+"""
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SQLDatabaseConnection
+
+
+@receiver(post_save, sender=SQLDatabaseConnection)
+@receiver(post_delete, sender=SQLDatabaseConnection)
+def evict_cached_agent(sender, instance, **kwargs):
+    """Drop the cached SQL agent when its database connection changes"""
+    from .ai_agent import clear_agent_cache
+
+    clear_agent_cache(instance.id)
+
+
+@receiver(setting_changed)
+def reset_openai_configured(sender, setting, **kwargs):
+    """Recheck the OpenAI API key after settings are overridden (e.g. in tests)"""
+    if setting == "OPENAI_API_KEY":
+        from .utils import is_openai_configured
+
+        is_openai_configured.cache_clear()
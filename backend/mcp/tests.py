@@ -1,3 +1,664 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import json
+import os
+import queue
+import tempfile
+import threading
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from langchain_community.utilities import SQLDatabase
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from . import query_cache
+from .admin_filters import cached_values_filter
+from .admin_paginators import EstimatedCountPaginator
+from .ai_agent import (
+    SINGLE_SHOT_TOP_K,
+    SingleShotSQLChain,
+    SQLAIAgent,
+    _coalesce_tokens,
+    _track_deferred_visualization,
+    get_deferred_visualization,
+    process_natural_language_query,
+)
+from .encoders import ORJSONEncoder
+from .management.commands import load_transactions
+from .models import (
+    OpenAIMCPRequest,
+    OpenAIMCPResponse,
+    SQLDatabaseConnection,
+    SQLToolExecution,
+    Transaction,
+)
+from .query_cache import query_literals
+from .renderers import ORJSONRenderer
+from .utils import (
+    _DANGEROUS_SQL_RE,
+    apply_row_limit,
+    generate_request_id,
+    is_select_query,
+    parse_select_statement,
+    validate_sql_query,
+)
+from .writebuffer import WriteBuffer
+
+
+class AIQueryStreamViewTests(SimpleTestCase):
+    """Server-Sent Events endpoint for AI queries"""
+
+    async def test_streams_events_under_asgi(self):
+        events = [
+            {"type": "token", "text": "Hello"},
+            {"type": "done", "response": {"success": True, "result": "Hello"}},
+        ]
+        with mock.patch("mcp.ai_agent.stream_natural_language_query", return_value=iter(events)):
+            response = await self.async_client.post(
+                reverse("mcp:ai-query-stream"),
+                {"query": "How many transactions?", "database_id": 1},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        # An async iterator is streamed frame by frame instead of being buffered
+        self.assertTrue(response.is_async)
+
+        frames = [frame async for frame in response.streaming_content]
+        self.assertEqual(len(frames), 2)
+        self.assertTrue(frames[0].startswith(b"event: token\ndata: "))
+        self.assertTrue(frames[1].startswith(b"event: done\ndata: "))
+        self.assertIn(b'"result":"Hello"', frames[1])
+
+
+class AIQueryAuditTests(TestCase):
+    """Audit rows for AI queries that fail before the agent runs"""
+
+    def test_unknown_connection_is_recorded(self):
+        result = process_natural_language_query("How many transactions?", database_id=999)
+
+        self.assertEqual(result, {"success": False, "error": "Database connection not found: 999"})
+        request = OpenAIMCPRequest.objects.get(method="ai_query")
+        response = request.responses.get()
+        self.assertEqual(response.status, "error")
+        self.assertEqual(response.error["message"], "Database connection not found: 999")
+
+
+class CoalesceTokensTests(SimpleTestCase):
+    """Merging of streamed token events into growing batches"""
+
+    def coalesce(self, *events):
+        pending = queue.Queue()
+        for event in events:
+            pending.put(event)
+        return list(_coalesce_tokens(pending))
+
+    def test_first_token_is_sent_alone_then_batches_grow(self):
+        tokens = [{"type": "token", "text": text} for text in "abcde"]
+        done = {"type": "done", "response": {"success": True}}
+
+        self.assertEqual(self.coalesce(*tokens, done), [
+            {"type": "token", "text": "a"},
+            {"type": "token", "text": "bcd"},
+            {"type": "token", "text": "e"},
+            done,
+        ])
+
+    def test_other_events_end_a_batch(self):
+        sql = {"type": "sql", "query": "SELECT 1"}
+        done = {"type": "done", "response": {"success": True}}
+
+        self.assertEqual(
+            self.coalesce({"type": "token", "text": "a"}, {"type": "token", "text": "b"}, sql,
+                          {"type": "token", "text": "c"}, done, {"type": "token", "text": "late"}),
+            [{"type": "token", "text": "a"}, {"type": "token", "text": "b"}, sql,
+             {"type": "token", "text": "c"}, done],
+        )
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """API responses rendered with orjson"""
+
+    def test_native_and_fallback_types(self):
+        data = {
+            "created_at": datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc),
+            "amount": Decimal("2.50"),
+            "count": np.int64(3),
+            "city": gettext_lazy("Almaty"),
+            1: "non-string key",
+        }
+
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(json.loads(rendered), {
+            "created_at": "2024-01-01T12:00:00Z",
+            "amount": 2.5,
+            "count": 3,
+            "city": "Almaty",
+            "1": "non-string key",
+        })
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indent_for_browsable_api(self):
+        self.assertEqual(ORJSONRenderer().render({"a": 1}, renderer_context={"indent": 4}), b'{\n  "a": 1\n}')
+
+
+class ORJSONEncoderTests(TestCase):
+    """Tool execution JSON stored with orjson"""
+
+    def test_values_round_trip(self):
+        database = SQLDatabaseConnection.objects.create(name="test", database_uri="sqlite://")
+        execution = SQLToolExecution.objects.create(
+            database=database,
+            tool_name="QuerySQLDataBaseTool",
+            tool_input={"query": "SELECT 1"},
+            query_result={"rows": np.array([1, 2]), "total": Decimal("2.50"), "count": np.int64(3)},
+        )
+
+        execution.refresh_from_db()
+        self.assertEqual(execution.query_result, {"rows": [1, 2], "total": "2.50", "count": 3})
+        self.assertEqual(
+            json.loads(ORJSONEncoder().encode({"day": datetime(2024, 1, 1, 12, 0), 1: gettext_lazy("x")})),
+            {"day": "2024-01-01T12:00:00", "1": "x"},
+        )
+
+
+class SemanticQueryCacheTests(SimpleTestCase):
+    """Near-duplicate lookups in the AI query cache"""
+
+    def setUp(self):
+        self.index_key = (1, "v1", "gpt-4o-mini")
+        self.vector = np.array([1.0, 0.0], dtype=np.float32)
+        self.addCleanup(query_cache._semantic_index.clear)
+
+    def test_literals_must_match(self):
+        query_cache._semantic_add(self.index_key, "key-2023", self.vector, query_literals("Total spend in 2023"), 60)
+
+        self.assertEqual(
+            query_cache._semantic_match(self.index_key, self.vector, query_literals("total spend in  2023"), 0.95),
+            "key-2023",
+        )
+        self.assertIsNone(
+            query_cache._semantic_match(self.index_key, self.vector, query_literals("Total spend in 2024"), 0.95)
+        )
+
+    @override_settings(MCP_SEMANTIC_CACHE_THRESHOLD=0)
+    def test_zero_threshold_skips_embeddings(self):
+        self.assertFalse(query_cache.QueryResultCache(database_id=1, timeout=60).semantic_enabled)
+
+
+class DeferredVisualizationTests(SimpleTestCase):
+    """Charts rendered after the answer was returned"""
+
+    def setUp(self):
+        self.addCleanup(query_cache._local_cache.clear)
+
+    def test_chart_is_added_to_cached_answer(self):
+        result_cache = query_cache.QueryResultCache(database_id=1, timeout=60)
+        response = {"success": True, "result": "42"}
+        result_cache.set("Total spend", dict(response))
+        future = Future()
+
+        task_id = _track_deferred_visualization(future, result_cache, "Total spend", response)
+        self.assertEqual(get_deferred_visualization(task_id), {"status": "pending"})
+        future.set_result({"chart_type": "bar"})
+
+        self.assertEqual(
+            get_deferred_visualization(task_id),
+            {"status": "done", "visualization": {"chart_type": "bar"}},
+        )
+        self.assertEqual(result_cache.get("Total spend")["visualization"], {"chart_type": "bar"})
+
+    def test_uncached_answer_stays_uncached(self):
+        result_cache = query_cache.QueryResultCache(database_id=1, timeout=60)
+        future = Future()
+
+        _track_deferred_visualization(future, None, "Total spend", {"success": True})
+        future.set_result({"chart_type": "bar"})
+
+        self.assertIsNone(result_cache.get("Total spend"))
+
+
+class DataPreviewTests(SimpleTestCase):
+    """Conversion of query results to JSON-serializable preview rows"""
+
+    def test_values_are_plain_json_types(self):
+        df = pd.DataFrame({
+            "merchant_city": ["Almaty", None],
+            "transactions": np.array([1, 2], dtype=np.int16),
+            "amount": [1.5, float("nan")],
+            "total": [Decimal("2.50"), None],
+            "day": pd.to_datetime(["2024-01-01 12:00", None]),
+            "is_online": [True, False],
+        })
+
+        # The conversion does not use the agent's connection
+        rows = SQLAIAgent.__new__(SQLAIAgent)._dataframe_to_json_serializable(df)
+
+        self.assertEqual(rows, [
+            {"merchant_city": "Almaty", "transactions": 1, "amount": 1.5, "total": 2.5,
+             "day": "2024-01-01T12:00:00", "is_online": True},
+            {"merchant_city": None, "transactions": 2, "amount": None, "total": None,
+             "day": None, "is_online": False},
+        ])
+        self.assertIs(type(rows[0]["transactions"]), int)
+
+
+class SingleShotSQLChainTests(SimpleTestCase):
+    """One SQL call plus one answer call for small schemas"""
+
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE mcp_transactions (merchant_city VARCHAR(255))"))
+            conn.execute(text("INSERT INTO mcp_transactions VALUES ('Almaty'), ('Astana')"))
+        self.db = SQLDatabase(engine)
+        self.llm = mock.Mock()
+
+    def replies(self, *contents):
+        self.llm.invoke.side_effect = [SimpleNamespace(content=content) for content in contents]
+
+    def test_generated_select_is_limited_and_answered(self):
+        self.replies("```sql\nSELECT merchant_city FROM mcp_transactions\n```", "Almaty and Astana")
+
+        result = SingleShotSQLChain(self.llm, self.db).invoke({"input": "Which cities?"})
+
+        self.assertEqual(result, {"output": "Almaty and Astana"})
+        [_, (answer_messages,)] = [call.args for call in self.llm.invoke.call_args_list]
+        answer_prompt = answer_messages[1][1]
+        self.assertIn(f"SELECT merchant_city FROM mcp_transactions\nLIMIT {SINGLE_SHOT_TOP_K}", answer_prompt)
+        self.assertIn("Almaty", answer_prompt)
+
+    def test_stacked_statements_are_not_run(self):
+        self.replies("SELECT 1; DROP TABLE mcp_transactions")
+
+        with self.assertRaises(ValueError):
+            SingleShotSQLChain(self.llm, self.db).invoke({"input": "Drop everything"})
+
+        self.assertEqual(self.llm.invoke.call_count, 1)
+        self.assertEqual(self.db.get_usable_table_names(), ["mcp_transactions"])
+
+    def test_non_select_is_rejected(self):
+        self.replies("UPDATE mcp_transactions SET merchant_city = 'x'")
+
+        with self.assertRaises(ValueError):
+            SingleShotSQLChain(self.llm, self.db).invoke({"input": "Rename cities"})
+
+        self.assertEqual(self.db.run("SELECT COUNT(*) FROM mcp_transactions WHERE merchant_city = 'x'"), "[(0,)]")
+
+
+class SQLSafetyTests(SimpleTestCase):
+    """Guards applied before user or LLM generated SQL is executed"""
+
+    def test_stacked_statements_are_rejected(self):
+        query = "SELECT * FROM mcp_transactions; DROP TABLE mcp_transactions"
+
+        self.assertFalse(is_select_query(query))
+        self.assertIsNone(parse_select_statement(query))
+        is_valid, error = validate_sql_query(query)
+        self.assertFalse(is_valid)
+        self.assertIn("DROP", error)
+        self.assertIsNotNone(_DANGEROUS_SQL_RE.search(query))
+        # Not a single SELECT, so no LIMIT is appended to it
+        self.assertEqual(apply_row_limit(query, 10), query)
+
+    def test_comments_do_not_hide_dml(self):
+        self.assertFalse(is_select_query("/* SELECT */ DELETE FROM mcp_transactions"))
+        self.assertFalse(is_select_query("SELECT 1 -- harmless\n; DELETE FROM mcp_transactions"))
+        self.assertFalse(validate_sql_query("SELECT 1 -- harmless\n; DELETE FROM mcp_transactions")[0])
+
+    def test_keywords_in_literals_and_comments_are_ignored(self):
+        self.assertTrue(is_select_query("SELECT 'drop table' AS note -- delete later"))
+        self.assertIsNone(_DANGEROUS_SQL_RE.search("SELECT created_at FROM mcp_transactions"))
+
+    def test_existing_limit_is_kept(self):
+        query = "SELECT * FROM mcp_transactions LIMIT 5"
+
+        self.assertEqual(apply_row_limit(query, 1000), query)
+        self.assertEqual(
+            apply_row_limit("SELECT * FROM mcp_transactions FETCH FIRST 5 ROWS ONLY", 1000),
+            "SELECT * FROM mcp_transactions FETCH FIRST 5 ROWS ONLY",
+        )
+
+    def test_limit_is_appended(self):
+        self.assertEqual(
+            apply_row_limit("SELECT * FROM mcp_transactions;", 1000),
+            "SELECT * FROM mcp_transactions\nLIMIT 1000",
+        )
+        # A LIMIT inside a subquery does not bound the outer result
+        self.assertEqual(
+            apply_row_limit("SELECT * FROM (SELECT * FROM mcp_transactions LIMIT 5) t", 1000),
+            "SELECT * FROM (SELECT * FROM mcp_transactions LIMIT 5) t\nLIMIT 1000",
+        )
+        # A trailing line comment is dropped so it cannot swallow the appended clause
+        self.assertEqual(
+            apply_row_limit("SELECT * FROM mcp_transactions -- all rows", 1000),
+            "SELECT * FROM mcp_transactions\nLIMIT 1000",
+        )
+
+    def test_ctes(self):
+        query = "WITH city AS (SELECT merchant_city FROM mcp_transactions) SELECT * FROM city"
+
+        self.assertTrue(is_select_query(query))
+        self.assertEqual(apply_row_limit(query, 1000), f"{query}\nLIMIT 1000")
+        # Data-modifying CTEs are not read-only
+        self.assertFalse(is_select_query(
+            "WITH gone AS (DELETE FROM mcp_transactions RETURNING *) SELECT * FROM gone"
+        ))
+        self.assertFalse(is_select_query("WITH t AS (SELECT 1) SELECT * INTO copy FROM t"))
+
+
+class RequestIdTests(SimpleTestCase):
+    """MCP request ID generation"""
+
+    def test_ids_are_unique_within_a_millisecond(self):
+        with mock.patch("mcp.utils.time") as time:
+            time.time_ns.return_value = 1_700_000_000_000_000_000
+            ids = [generate_request_id("ai_query") for _ in range(1000)]
+
+        self.assertEqual(len(set(ids)), 1000)
+        prefix, timestamp, pid, _ = ids[0].rsplit("_", 3)
+        self.assertEqual(prefix, "ai_query")
+        self.assertEqual(int(timestamp, 16), 1_700_000_000_000)
+        self.assertEqual(int(pid, 16), os.getpid())
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Planner row estimates for unfiltered admin changelists"""
+
+    def setUp(self):
+        for request_id in ("req-1", "req-2", "req-3"):
+            OpenAIMCPRequest.objects.create(method="tools/list", request_id=request_id)
+
+    def test_large_estimate_replaces_count(self):
+        paginator = EstimatedCountPaginator(OpenAIMCPRequest.objects.all(), 10)
+
+        with mock.patch.object(paginator, "_estimated_count", return_value=50_000):
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 50_000)
+
+    def test_small_or_missing_estimate_counts_exactly(self):
+        for estimate in (5, -1, None):
+            paginator = EstimatedCountPaginator(OpenAIMCPRequest.objects.all(), 10)
+            with mock.patch.object(paginator, "_estimated_count", return_value=estimate):
+                self.assertEqual(paginator.count, 3)
+
+    def test_filtered_querysets_are_not_estimated(self):
+        for queryset in (
+            OpenAIMCPRequest.objects.filter(method="tools/call"),
+            OpenAIMCPRequest.objects.values("method").distinct(),
+            OpenAIMCPRequest.objects.all().union(OpenAIMCPRequest.objects.all()),
+        ):
+            with self.assertNumQueries(0):
+                self.assertIsNone(EstimatedCountPaginator(queryset, 10)._estimated_count())
+
+        self.assertIsInstance(EstimatedCountPaginator(OpenAIMCPRequest.objects.all(), 10)._estimated_count(), int)
+
+
+class CachedValuesListFilterTests(TestCase):
+    """Admin filter options cached instead of a SELECT DISTINCT per render"""
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.model_admin = admin.site._registry[Transaction]
+        self.request = RequestFactory().get("/")
+        for transaction_id, city in (("t-1", "Astana"), ("t-2", "Almaty"), ("t-3", "Almaty")):
+            self.create_transaction(transaction_id, city)
+
+    def create_transaction(self, transaction_id, city):
+        Transaction.objects.create(
+            transaction_id=transaction_id,
+            transaction_timestamp=datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc),
+            card_id=10000,
+            expiry_date="09/26",
+            issuer_bank_name="Bank",
+            merchant_id=50001,
+            merchant_mcc=5499,
+            mcc_category="Grocery",
+            merchant_city=city,
+            transaction_type="POS",
+            transaction_amount_kzt=Decimal("100.00"),
+            transaction_currency="KZT",
+            acquirer_country_iso="KAZ",
+            pos_entry_mode="Chip",
+        )
+
+    def make_filter(self, params=None):
+        filter_class = cached_values_filter("merchant_city")
+        return filter_class(self.request, dict(params or {}), Transaction, self.model_admin)
+
+    def test_lookups_are_cached(self):
+        expected = [("Almaty", "Almaty"), ("Astana", "Astana")]
+        self.assertEqual(self.make_filter().lookups(self.request, self.model_admin), expected)
+        self.create_transaction("t-4", "Shymkent")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.make_filter().lookups(self.request, self.model_admin), expected)
+
+    def test_selected_value_filters_queryset(self):
+        list_filter = self.make_filter({"merchant_city": ["Almaty"]})
+
+        self.assertEqual(list_filter.title, Transaction._meta.get_field("merchant_city").verbose_name)
+        self.assertEqual(
+            sorted(list_filter.queryset(self.request, Transaction.objects.all()).values_list("transaction_id", flat=True)),
+            ["t-2", "t-3"],
+        )
+        self.assertEqual(self.make_filter().queryset(self.request, Transaction.objects.all()).count(), 3)
+
+
+class WriteBufferTests(TestCase):
+    """Batched inserts of audit rows"""
+
+    def setUp(self):
+        self.request = OpenAIMCPRequest.objects.create(method="tools/list", request_id="req-1")
+
+    def make_response(self, response_id):
+        return OpenAIMCPResponse(request=self.request, response_id=response_id, status="success")
+
+    def test_flush_persists_enqueued_rows(self):
+        buffer = WriteBuffer(flush_interval=60)
+        buffer.enqueue(self.make_response("req-1"))
+        buffer.enqueue(self.make_response("req-1"))
+
+        self.assertEqual(OpenAIMCPResponse.objects.count(), 0)
+        buffer.flush()
+        self.assertEqual(OpenAIMCPResponse.objects.count(), 2)
+
+    def test_zero_interval_writes_on_enqueue(self):
+        WriteBuffer(flush_interval=0).enqueue(self.make_response("req-1"))
+
+        self.assertEqual(OpenAIMCPResponse.objects.count(), 1)
+
+    @override_settings(MCP_WRITE_BUFFER_INTERVAL=0)
+    def test_interval_setting_is_read_on_enqueue(self):
+        WriteBuffer().enqueue(self.make_response("req-1"))
+
+        self.assertEqual(OpenAIMCPResponse.objects.count(), 1)
+
+    def test_timer_flushes_pending_rows(self):
+        buffer = WriteBuffer(flush_interval=0.01)
+        written = threading.Event()
+        batches = []
+
+        def write(model, batch):
+            batches.append((model, len(batch)))
+            written.set()
+
+        # The timer thread has its own DB connection, outside this test's transaction
+        with mock.patch.object(buffer, "_write", side_effect=write):
+            buffer.enqueue(self.make_response("req-1"))
+            buffer.enqueue(self.make_response("req-1"))
+            self.assertTrue(written.wait(timeout=5))
+
+        self.assertEqual(batches, [(OpenAIMCPResponse, 2)])
+        self.assertIsNone(buffer._timer)
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        buffer = WriteBuffer(flush_interval=60)
+        buffer.enqueue(self.make_response("req-1"))
+        buffer.enqueue(self.make_response("req-1"))
+
+        with mock.patch.object(OpenAIMCPResponse.objects, "bulk_create", side_effect=RuntimeError("boom")):
+            buffer.flush()
+
+        self.assertEqual(OpenAIMCPResponse.objects.count(), 2)
+
+
+def write_transactions_parquet(directory, **overrides):
+    """Write a three-row transactions Parquet file (columns as pandas would store them)"""
+    data = {
+        "transaction_id": ["t-1", "t-2", "t-3"],
+        "transaction_timestamp": pa.array([datetime(2024, 1, 1, 12, 0)] * 3, pa.timestamp("us")),
+        # pandas stores a nullable integer column as float64 with NaN
+        "card_id": [10000.0, float("nan"), 10002.0],
+        "expiry_date": ["09/26", None, "01/27"],
+        "issuer_bank_name": ["Bank"] * 3,
+        "merchant_id": [50001, 50002, 50003],
+        "merchant_mcc": [5499, 5411, 4814],
+        "mcc_category": ["Grocery"] * 3,
+        "merchant_city": ["Almaty", "Astana", "Shymkent"],
+        "transaction_type": ["POS"] * 3,
+        "transaction_amount_kzt": [1200.5, float("nan"), 99.99],
+        "original_amount": [None, 10.0, None],
+        "transaction_currency": ["KZT"] * 3,
+        "acquirer_country_iso": ["KAZ"] * 3,
+        "pos_entry_mode": ["Chip", None, "QR_Code"],
+        "wallet_type": ["Apple Pay", None, None],
+    }
+    data.update(overrides)
+    path = Path(directory) / "transactions.parquet"
+    pq.write_table(pa.table(data), path)
+    return path
+
+
+class LoadTransactionsConversionTests(SimpleTestCase):
+    """Parquet to Transaction conversion in the load_transactions command"""
+
+    def prepare(self, **overrides):
+        with tempfile.TemporaryDirectory() as directory:
+            parquet = pq.ParquetFile(write_transactions_parquet(directory, **overrides))
+            return list(load_transactions._prepare_batches(parquet, batch_size=10))
+
+    def test_nan_in_integer_column_becomes_zero(self):
+        [(_, next_row, invalid, failed, error, columns, batch)] = self.prepare()
+
+        self.assertEqual((next_row, invalid, failed, error), (3, 0, 0, None))
+        self.assertEqual(columns["card_id"], [10000, 0, 10002])
+        self.assertEqual([t.card_id for t in batch], [10000, 0, 10002])
+        self.assertEqual(columns["transaction_amount_kzt"], [1200.5, 0.0, 99.99])
+        self.assertEqual(columns["expiry_date"], ["09/26", "", "01/27"])
+        self.assertEqual(columns["wallet_type"], ["Apple Pay", None, None])
+        self.assertEqual(
+            batch[0].transaction_timestamp,
+            datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc),
+        )
+
+    def test_rows_without_id_are_dropped_alone(self):
+        [(_, _, invalid, failed, _, columns, batch)] = self.prepare(transaction_id=["t-1", None, "t-3"])
+
+        self.assertEqual((invalid, failed), (1, 0))
+        self.assertEqual(columns["transaction_id"], ["t-1", "t-3"])
+        self.assertEqual(len(batch), 2)
+
+    def test_unconvertible_row_does_not_drop_the_batch(self):
+        extract = load_transactions._extract_columns
+
+        def fail_on_t2(record_batch):
+            if "t-2" in record_batch.column("transaction_id").to_pylist():
+                raise ValueError("bad value")
+            return extract(record_batch)
+
+        with mock.patch.object(load_transactions, "_extract_columns", side_effect=fail_on_t2):
+            [(_, _, invalid, failed, error, columns, _)] = self.prepare()
+
+        self.assertEqual((invalid, failed), (0, 1))
+        self.assertIsInstance(error, ValueError)
+        self.assertEqual(columns["transaction_id"], ["t-1", "t-3"])
+
+
+class LoadTransactionsCommandTests(TestCase):
+    """load_transactions management command against the test database"""
+
+    def load(self, *args, **overrides):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = write_transactions_parquet(directory.name, **overrides)
+        call_command("load_transactions", *args, file=str(path), stdout=StringIO())
+
+    def test_orm_engine_loads_rows(self):
+        self.load()
+
+        self.assertEqual(
+            list(Transaction.objects.order_by("transaction_id").values_list("transaction_id", "card_id")),
+            [("t-1", 10000), ("t-2", 0), ("t-3", 10002)],
+        )
+        first = Transaction.objects.get(transaction_id="t-1")
+        self.assertEqual(first.transaction_amount_kzt, Decimal("1200.50"))
+        self.assertIsNone(first.original_amount)
+        self.assertEqual(first.transaction_timestamp, datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc))
+
+    def test_limit_and_duplicates(self):
+        self.load("--limit", "2")
+        self.assertEqual(Transaction.objects.count(), 2)
+
+        # Rows already loaded are skipped, not duplicated
+        self.load()
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_copy_engine_escapes_text(self):
+        cities = ["Al\tmaty", "C:\\Astana", "Shym\nkent"]
+        self.load("--engine", "copy", merchant_city=cities)
+
+        self.assertEqual(
+            list(Transaction.objects.order_by("transaction_id").values_list("merchant_city", "card_id", "wallet_type")),
+            [(cities[0], 10000, "Apple Pay"), (cities[1], 0, None), (cities[2], 10002, None)],
+        )
+        self.assertIsNotNone(Transaction.objects.get(transaction_id="t-2").created_at)
+
+    def test_copy_engine_skips_batch_with_duplicates(self):
+        self.load("--engine", "copy", "--limit", "1")
+
+        # A duplicate aborts the COPY; only that batch's savepoint is rolled back
+        self.load("--engine", "copy")
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def transaction_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s ORDER BY indexname",
+                [Transaction._meta.db_table],
+            )
+            return cursor.fetchall()
+
+    def test_drop_indexes_rebuilds_them(self):
+        before = self.transaction_indexes()
+
+        with mock.patch.object(
+            load_transactions, "_create_indexes", wraps=load_transactions._create_indexes
+        ) as create_indexes:
+            self.load("--drop-indexes")
+
+        create_indexes.assert_called_once()
+        dropped = create_indexes.call_args.args[0]
+        # Secondary indexes only; the primary key and unique transaction_id stay in place
+        self.assertTrue(dropped)
+        self.assertNotIn(f"{Transaction._meta.db_table}_pkey", [name for name, _ in dropped])
+        self.assertEqual(self.transaction_indexes(), before)
+        self.assertEqual(Transaction.objects.count(), 3)
 
-# Create your tests here.
@@ -6,6 +6,8 @@ from .views import (
     QuickExploreView,
     QuickQueryView,
     AIQueryView,
+    AIQueryStreamView,
+    AIQueryVisualizationView,
     MCPStatisticsView,
     ExportDataView,
     AudioTranscriptionView,
@@ -32,6 +34,8 @@ urlpatterns = [
 
     # AI Natural Language Query
     path('ai-query/', AIQueryView.as_view(), name='ai-query'),
+    path('ai-query/stream/', AIQueryStreamView.as_view(), name='ai-query-stream'),
+    path('ai-query/visualization/<str:task_id>/', AIQueryVisualizationView.as_view(), name='ai-query-visualization'),
 
     # Deep Query (chain operations)
     path('deep-query/', DeepQueryView.as_view(), name='deep-query'),
@@ -4,9 +4,23 @@ Includes OpenAI LLM initialization and helper functions
 """
 
 from django.conf import settings
-from langchain_openai import ChatOpenAI
+from langchain_community.utilities import SQLDatabase
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from openai import OpenAI
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from functools import lru_cache
 from typing import Optional
+from sqlparse import sql as sql_ast, tokens as sql_tokens
+import atexit
+import importlib.util
+import itertools
+import httpx
 import os
+import re
+import sqlparse
+import threading
+import time
 
 
 def get_openai_llm(
@@ -33,17 +47,89 @@ def get_openai_llm(
             "OPENAI_API_KEY is not set. Please set it in your .env file or environment variables."
         )
 
+    return _build_openai_llm(
+        model or settings.OPENAI_MODEL,
+        temperature if temperature is not None else settings.OPENAI_TEMPERATURE,
+        api_key,
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_openai_llm(model: str, temperature: float, api_key: str) -> ChatOpenAI:
+    """ChatOpenAI is stateless, so one instance per (model, temperature, key) is reused"""
     return ChatOpenAI(
-        model=model or settings.OPENAI_MODEL,
-        temperature=temperature if temperature is not None else settings.OPENAI_TEMPERATURE,
+        model=model,
+        temperature=temperature,
+        api_key=api_key,
+        http_client=get_openai_http_client(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_openai_http_client() -> httpx.Client:
+    """
+    Get shared HTTP client for OpenAI requests
+
+    Keeps connections to the API alive between calls so each LLM request
+    skips the TCP/TLS handshake. HTTP/2 is used when the h2 package is installed.
+
+    Returns:
+        httpx.Client instance (one per process)
+    """
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=15.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+
+
+@lru_cache(maxsize=4)
+def get_openai_client(api_key: str) -> OpenAI:
+    """
+    Get shared raw OpenAI client (used for visualization chart selection/insights)
+
+    Short timeouts keep a slow completion from holding up the chart; the
+    HTTP client is shared so calls reuse keep-alive connections.
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        OpenAI instance (one per key per process)
+    """
+    return OpenAI(
         api_key=api_key,
+        timeout=httpx.Timeout(connect=2.0, read=5.0, write=2.0, pool=5.0),
+        http_client=get_openai_http_client(),
     )
 
 
+@lru_cache(maxsize=4)
+def get_openai_embeddings(model: str) -> OpenAIEmbeddings:
+    """
+    Get shared OpenAI embeddings client
+
+    Args:
+        model: Embedding model name (e.g. text-embedding-3-small)
+
+    Returns:
+        OpenAIEmbeddings instance (one per model per process)
+    """
+    return OpenAIEmbeddings(
+        model=model,
+        api_key=settings.OPENAI_API_KEY or os.getenv('OPENAI_API_KEY'),
+        http_client=get_openai_http_client(),
+    )
+
+
+@lru_cache(maxsize=1)
 def is_openai_configured() -> bool:
     """
     Check if OpenAI API key is configured
 
+    The result is memoized; it is reset when OPENAI_API_KEY is overridden
+    (see signals.reset_openai_configured).
+
     Returns:
         True if API key is set, False otherwise
     """
@@ -74,6 +160,107 @@ def get_llm_for_sql_toolkit(
         return None
 
 
+# Engines created by get_sql_engine, disposed at exit
+_engines: list[Engine] = []
+
+
+@lru_cache(maxsize=None)
+def get_sql_engine(database_uri: str) -> Engine:
+    """
+    Get shared SQLAlchemy engine for a database URI
+
+    The engine owns a connection pool, so reusing it avoids a new
+    TCP/TLS/auth handshake for every request.
+
+    Args:
+        database_uri: SQLAlchemy database URI
+
+    Returns:
+        Engine instance (one per URI per process)
+    """
+    engine = create_engine(
+        database_uri,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        # Reuse the most recently returned connection so surplus ones stay idle and can be recycled
+        pool_use_lifo=True,
+    )
+    _engines.append(engine)
+    return engine
+
+
+def _dispose_engines() -> None:
+    """Close pooled connections cleanly on interpreter exit"""
+    for engine in _engines:
+        engine.dispose()
+
+
+atexit.register(_dispose_engines)
+
+
+class CachedSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase that memoizes rendered table info
+
+    get_table_info renders CREATE TABLE statements and runs a sample-row
+    SELECT per table on every call; the agent asks for it on most questions.
+    Results are kept per table selection for table_info_ttl seconds.
+    """
+
+    def __init__(self, *args, table_info_ttl: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._table_info_ttl = table_info_ttl
+        self._table_info_cache: dict[Optional[tuple], tuple[float, str]] = {}
+        self._table_info_lock = threading.Lock()
+
+    def get_table_info(self, table_names: Optional[list[str]] = None) -> str:
+        key = tuple(sorted(table_names)) if table_names else None
+        now = time.monotonic()
+
+        with self._table_info_lock:
+            entry = self._table_info_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        table_info = super().get_table_info(table_names)
+        with self._table_info_lock:
+            self._table_info_cache[key] = (now + self._table_info_ttl, table_info)
+        return table_info
+
+
+@lru_cache(maxsize=32)
+def get_sql_database(
+    database_uri: str,
+    sample_rows_in_table_info: int = 3,
+    include_tables: Optional[tuple] = None,
+) -> SQLDatabase:
+    """
+    Get cached LangChain SQLDatabase
+
+    Schema reflection runs once per connection configuration instead of on
+    every request, and rendered table info (with sample rows) is cached for
+    settings.MCP_TABLE_INFO_TTL seconds.
+
+    Args:
+        database_uri: SQLAlchemy database URI
+        sample_rows_in_table_info: Number of sample rows to include in table info
+        include_tables: Tuple of tables to include (None for all)
+
+    Returns:
+        SQLDatabase bound to the shared engine for the URI
+    """
+    return CachedSQLDatabase(
+        get_sql_engine(database_uri),
+        sample_rows_in_table_info=sample_rows_in_table_info,
+        include_tables=list(include_tables) if include_tables else None,
+        # Reflect a table's columns only when the agent first asks for its schema
+        lazy_table_reflection=True,
+        table_info_ttl=getattr(settings, 'MCP_TABLE_INFO_TTL', 3600),
+    )
+
+
 def format_sql_result(result: str, max_length: int = 1000) -> str:
     """
     Format SQL query result for display
@@ -90,6 +277,15 @@ def format_sql_result(result: str, max_length: int = 1000) -> str:
     return result
 
 
+# Statements rejected by validate_sql_query
+DANGEROUS_SQL_KEYWORDS = ('drop', 'truncate', 'delete', 'alter', 'create')
+# Matches a dangerous keyword at the start of any statement, including ones stacked after ';'
+_DANGEROUS_SQL_RE = re.compile(
+    r'(?:\A|;)\s*(' + '|'.join(map(re.escape, DANGEROUS_SQL_KEYWORDS)) + r')\b',
+    re.IGNORECASE,
+)
+
+
 def validate_sql_query(query: str) -> tuple[bool, Optional[str]]:
     """
     Basic SQL query validation
@@ -100,20 +296,109 @@ def validate_sql_query(query: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not query or not query.strip():
+    if not query or query.isspace():
         return False, "Query is empty"
 
-    query_lower = query.lower().strip()
-
-    # Check for dangerous operations
-    dangerous_keywords = ['drop', 'truncate', 'delete', 'alter', 'create']
-    for keyword in dangerous_keywords:
-        if query_lower.startswith(keyword):
-            return False, f"Query starts with dangerous keyword: {keyword.upper()}"
+    # Check for dangerous operations in a single pass (no lowercased copy of the query)
+    match = _DANGEROUS_SQL_RE.search(query)
+    if match:
+        keyword = match.group(1).upper()
+        if match.start() == 0:
+            return False, f"Query starts with dangerous keyword: {keyword}"
+        return False, f"Query contains dangerous statement: {keyword}"
 
     return True, None
 
 
+_SELECT_PREFIX_RE = re.compile(r'\s*SELECT\b', re.IGNORECASE)
+
+
+def starts_with_select(query: str) -> bool:
+    """
+    Cheap check that query begins with SELECT
+
+    Matches in place, so unlike query.strip().upper() it does not copy the
+    whole query just to look at the first keyword.
+    """
+    return isinstance(query, str) and _SELECT_PREFIX_RE.match(query) is not None
+
+
+def parse_select_statement(query: str) -> Optional[sql_ast.Statement]:
+    """
+    Parse query and return it only if it is a single read-only SELECT
+
+    Uses the sqlparse token stream, so keywords inside string literals or
+    comments are ignored and WITH ... SELECT is recognised as a SELECT.
+
+    Args:
+        query: SQL query string
+
+    Returns:
+        Parsed statement, or None if query is not exactly one SELECT statement
+    """
+    if not query or query.isspace():
+        return None
+
+    statements = [
+        statement for statement in sqlparse.parse(query)
+        if statement.token_first(skip_cm=True) is not None
+    ]
+    if len(statements) != 1 or statements[0].get_type() != "SELECT":
+        return None
+
+    # Reject data-modifying CTEs / SELECT INTO hidden behind a leading SELECT or WITH
+    for token in statements[0].flatten():
+        if token.ttype in sql_tokens.DDL:
+            return None
+        if token.ttype in sql_tokens.DML and token.normalized != "SELECT":
+            return None
+        if token.ttype in sql_tokens.Keyword and token.normalized == "INTO":
+            return None
+
+    return statements[0]
+
+
+def is_select_query(query: str) -> bool:
+    """Check that query is a single read-only SELECT statement"""
+    return parse_select_statement(query) is not None
+
+
+def apply_row_limit(query: str, max_rows: int) -> str:
+    """
+    Append LIMIT to a SELECT that has no top-level LIMIT/FETCH clause
+
+    Args:
+        query: SQL query string
+        max_rows: Row limit to add
+
+    Returns:
+        Query with a row limit, or the original query if it already has one
+        or is not a single SELECT statement
+    """
+    statement = parse_select_statement(query)
+    if statement is None:
+        return query
+
+    tokens = statement.tokens
+    # Only top-level tokens: a LIMIT inside a subquery does not bound the result
+    if any(token.ttype in sql_tokens.Keyword and token.normalized in ("LIMIT", "FETCH") for token in tokens):
+        return query
+
+    # Drop trailing ';', whitespace and comments before appending the clause
+    end = len(tokens)
+    while end and (
+        tokens[end - 1].is_whitespace
+        or tokens[end - 1].ttype in sql_tokens.Comment
+        or isinstance(tokens[end - 1], sql_ast.Comment)
+        or tokens[end - 1].match(sql_tokens.Punctuation, ";")
+    ):
+        end -= 1
+
+    body = "".join(str(token) for token in tokens[:end])
+    # Newline keeps the clause out of a trailing "--" comment grouped into the last token
+    return f"{body}\nLIMIT {int(max_rows)}"
+
+
 def parse_table_list(table_string: str) -> list[str]:
     """
     Parse comma-separated table list from LangChain output
@@ -130,6 +415,26 @@ def parse_table_list(table_string: str) -> list[str]:
     return [table.strip() for table in table_string.split(',') if table.strip()]
 
 
+# Per-process sequence for generate_request_id (next() on itertools.count is atomic under the GIL)
+_request_counter = itertools.count()
+
+
+def generate_request_id(prefix: str) -> str:
+    """
+    Generate a unique request ID
+
+    Millisecond timestamp keeps IDs roughly time-ordered; PID and a
+    per-process counter keep them unique for requests in the same millisecond.
+
+    Args:
+        prefix: ID prefix (e.g. "ai_query")
+
+    Returns:
+        ID like "ai_query_19a8f3c2b1e_1f4_2a"
+    """
+    return f"{prefix}_{time.time_ns() // 1_000_000:x}_{os.getpid():x}_{next(_request_counter):x}"
+
+
 def create_mcp_error_response(code: int, message: str, data: Optional[dict] = None) -> dict:
     """
     Create MCP-compliant error response
@@ -4,11 +4,14 @@ import traceback
 import io
 import base64
 from datetime import timedelta, datetime
+import orjson
 import pandas as pd
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Avg, Count
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -16,7 +19,6 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from urllib.parse import quote
 
-from langchain_community.utilities import SQLDatabase
 from langchain_community.tools.sql_database.tool import (
     QuerySQLDatabaseTool,
     InfoSQLDatabaseTool,
@@ -25,13 +27,18 @@ from langchain_community.tools.sql_database.tool import (
 
 from .utils import (
     get_llm_for_sql_toolkit,
+    get_sql_database,
+    get_sql_engine,
     is_openai_configured,
     format_sql_result,
     validate_sql_query,
+    is_select_query,
     parse_table_list,
     create_mcp_error_response,
     MCP_ERROR_CODES,
+    generate_request_id,
 )
+from .writebuffer import write_buffer
 
 from .models import (
     OpenAIMCPRequest,
@@ -84,13 +91,13 @@ def _get_gemini_model():
 # ============================================
 
 def create_langchain_db(connection: SQLDatabaseConnection):
-    """Create LangChain SQLDatabase from connection"""
+    """Create LangChain SQLDatabase from connection (cached per connection settings)"""
     try:
         # LangChain SQLDatabase only supports include_tables, not exclude_tables
-        db = SQLDatabase.from_uri(
+        db = get_sql_database(
             connection.database_uri,
             sample_rows_in_table_info=connection.sample_rows_in_table_info,
-            include_tables=connection.include_tables or None,
+            include_tables=tuple(connection.include_tables or ()) or None,
         )
         return db
     except Exception as e:
@@ -113,13 +120,12 @@ def execute_sql_tool(tool_name: str, db, tool_input: dict, connection: SQLDataba
     """
     start_time = time.time()
 
-    # Create tool execution record
-    tool_execution = SQLToolExecution.objects.create(
+    # Tool execution record is saved once, with its final status
+    tool_execution = SQLToolExecution(
         mcp_request=mcp_request,
         database=connection,
         tool_name=tool_name,
         tool_input=tool_input,
-        status="pending",
     )
 
     try:
@@ -189,13 +195,18 @@ def execute_sql_tool(tool_name: str, db, tool_input: dict, connection: SQLDataba
         tool_execution.completed_at = timezone.now()
         tool_execution.save()
 
-        return {
+        logger.warning("SQL tool %s failed: %s", tool_name, e)
+
+        response = {
             "success": False,
             "error": str(e),
-            "traceback": traceback.format_exc(),
             "execution_time_ms": execution_time,
             "tool_execution_id": tool_execution.id,
         }
+        # Formatting the stack is only worth it when someone will read it
+        if settings.DEBUG:
+            response["traceback"] = traceback.format_exc()
+        return response
 
 
 # ============================================
@@ -251,7 +262,7 @@ class DeepQueryView(APIView):
             jsonrpc="2.0",
             method="deep_query",
             params={"database_id": database_id, "operations": operations},
-            request_id=f"deep_query_{int(timezone.now().timestamp() * 1000)}",
+            request_id=generate_request_id("deep_query"),
             session_id=session_id,
             user_id=user_id,
             raw_request=request.data,
@@ -270,13 +281,13 @@ class DeepQueryView(APIView):
                 MCP_ERROR_CODES["INTERNAL_ERROR"],
                 str(e)
             )
-            OpenAIMCPResponse.objects.create(
+            write_buffer.enqueue(OpenAIMCPResponse(
                 request=mcp_request,
                 jsonrpc="2.0",
                 error=error_obj,
                 response_id=mcp_request.request_id,
                 status="error",
-            )
+            ))
 
             return Response(error_response, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -329,13 +340,16 @@ class DeepQueryView(APIView):
                     should_continue = False
 
             except Exception as e:
-                results.append({
+                logger.warning("Deep query operation %s failed: %s", op_type, e)
+                error_result = {
                     "operation": op_type,
                     "index": idx,
                     "success": False,
                     "error": str(e),
-                    "traceback": traceback.format_exc(),
-                })
+                }
+                if settings.DEBUG:
+                    error_result["traceback"] = traceback.format_exc()
+                results.append(error_result)
                 should_continue = False
 
         total_time = int((time.time() - total_start_time) * 1000)
@@ -364,7 +378,7 @@ class DeepQueryView(APIView):
             MCP_ERROR_CODES["INTERNAL_ERROR"],
             "Some operations failed"
         )
-        OpenAIMCPResponse.objects.create(
+        write_buffer.enqueue(OpenAIMCPResponse(
             request=mcp_request,
             jsonrpc="2.0",
             result=response_data if all_successful else None,
@@ -373,7 +387,7 @@ class DeepQueryView(APIView):
             status="success" if all_successful else "error",
             processing_time_ms=total_time,
             raw_response=response_data,
-        )
+        ))
 
         return Response(response_data)
 
@@ -476,7 +490,7 @@ class QuickExploreView(APIView):
             jsonrpc="2.0",
             method="quick_explore",
             params={"database_id": database_id},
-            request_id=f"explore_{int(timezone.now().timestamp() * 1000)}",
+            request_id=generate_request_id("explore"),
             session_id=request.headers.get("X-Session-ID"),
             user_id=request.headers.get("X-User-ID"),
             raw_request=request.data,
@@ -530,14 +544,14 @@ class QuickExploreView(APIView):
         results["total_execution_time_ms"] = total_time
 
         # Create MCP response
-        OpenAIMCPResponse.objects.create(
+        write_buffer.enqueue(OpenAIMCPResponse(
             request=mcp_request,
             jsonrpc="2.0",
             result=results,
             response_id=mcp_request.request_id,
             status="success",
             processing_time_ms=total_time,
-        )
+        ))
 
         return Response(results)
 
@@ -578,7 +592,7 @@ class QuickQueryView(APIView):
             jsonrpc="2.0",
             method="quick_query",
             params={"database_id": database_id, "sql": sql},
-            request_id=f"query_{int(timezone.now().timestamp() * 1000)}",
+            request_id=generate_request_id("query"),
             session_id=request.headers.get("X-Session-ID"),
             user_id=request.headers.get("X-User-ID"),
             raw_request=request.data,
@@ -615,7 +629,7 @@ class QuickQueryView(APIView):
                 MCP_ERROR_CODES["INTERNAL_ERROR"],
                 query_result.get("error", "Query execution failed")
             )
-        OpenAIMCPResponse.objects.create(
+        write_buffer.enqueue(OpenAIMCPResponse(
             request=mcp_request,
             jsonrpc="2.0",
             result=results if query_result["success"] else None,
@@ -623,7 +637,7 @@ class QuickQueryView(APIView):
             response_id=mcp_request.request_id,
             status="success" if query_result["success"] else "error",
             processing_time_ms=total_time,
-        )
+        ))
 
         return Response(results)
 
@@ -665,7 +679,7 @@ class MCPProtocolView(APIView):
             jsonrpc=jsonrpc,
             method=method,
             params=params,
-            request_id=str(request_id) if request_id else f"req_{int(timezone.now().timestamp() * 1000)}",
+            request_id=str(request_id) if request_id else generate_request_id("req"),
             session_id=request.headers.get("X-Session-ID"),
             user_id=request.headers.get("X-User-ID"),
             raw_request=request.data,
@@ -684,7 +698,7 @@ class MCPProtocolView(APIView):
             processing_time = int((time.time() - start_time) * 1000)
 
             # Create success response
-            OpenAIMCPResponse.objects.create(
+            write_buffer.enqueue(OpenAIMCPResponse(
                 request=mcp_request,
                 jsonrpc="2.0",
                 result=result,
@@ -692,7 +706,7 @@ class MCPProtocolView(APIView):
                 status="success",
                 processing_time_ms=processing_time,
                 raw_response={"jsonrpc": "2.0", "id": request_id, "result": result},
-            )
+            ))
 
             return Response({
                 "jsonrpc": "2.0",
@@ -702,15 +716,16 @@ class MCPProtocolView(APIView):
 
         except Exception as e:
             processing_time = int((time.time() - start_time) * 1000)
+            logger.exception("MCP protocol request %s failed", request_id)
 
-            # Create error response
+            # Create error response (traceback only in DEBUG)
             error_obj = create_mcp_error_response(
                 MCP_ERROR_CODES["INTERNAL_ERROR"],
                 str(e),
-                {"traceback": traceback.format_exc()}
+                {"traceback": traceback.format_exc()} if settings.DEBUG else None
             )
 
-            OpenAIMCPResponse.objects.create(
+            write_buffer.enqueue(OpenAIMCPResponse(
                 request=mcp_request,
                 jsonrpc="2.0",
                 error=error_obj,
@@ -718,7 +733,7 @@ class MCPProtocolView(APIView):
                 status="error",
                 processing_time_ms=processing_time,
                 raw_response={"jsonrpc": "2.0", "id": request_id, "error": error_obj},
-            )
+            ))
 
             return Response({
                 "jsonrpc": "2.0",
@@ -899,7 +914,8 @@ class MCPSessionViewSet(viewsets.ModelViewSet):
         """End an active session"""
         session = self.get_object()
         session.is_active = False
-        session.save()
+        # Only write the changed columns (last_activity is auto_now)
+        session.save(update_fields=["is_active", "last_activity"])
 
         return Response({
             "success": True,
@@ -949,16 +965,23 @@ class AIQueryView(APIView):
         "database_id": 1,
         "query": "How many transactions were made in Almaty?"
     }
+
+    Several questions can be sent at once with "queries": [...] instead of
+    "query"; they are processed concurrently and returned in order.
     """
 
+    # Upper bound on questions fanned out from a single batch request
+    MAX_BATCH_QUERIES = 10
+
     def post(self, request):
         """Process natural language query"""
         from .ai_agent import process_natural_language_query
 
         user_query = request.data.get("query")
+        user_queries = request.data.get("queries")
         database_id = request.data.get("database_id")
 
-        if not user_query:
+        if not user_query and not user_queries:
             return Response(
                 {"error": "query is required"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -974,6 +997,9 @@ class AIQueryView(APIView):
         session_id = request.headers.get("X-Session-ID")
         user_id = request.headers.get("X-User-ID")
 
+        if not user_query:
+            return self.post_batch(user_queries, database_id, session_id, user_id)
+
         # Process query with AI Agent
         result = process_natural_language_query(
             user_query=user_query,
@@ -982,36 +1008,183 @@ class AIQueryView(APIView):
             user_id=user_id,
         )
 
-        # Persist interaction for Telegram users so History tab can show recent queries
-        telegram_user = get_telegram_user_from_request(request)
-        if telegram_user:
-            try:
-                response_payload = result.get("result")
-                response_text = (
-                    response_payload if isinstance(response_payload, str) else None
-                ) or result.get("error") or ""
-
-                ChatInteraction.objects.create(
-                    user=telegram_user,
-                    message_text=user_query,
-                    response_text=response_text,
-                    query_generated=result.get("sql_query"),
-                    query_result=response_payload
-                    if isinstance(response_payload, (dict, list))
-                    else None,
-                    success=result.get("success", False),
-                    error_message=None if result.get("success") else result.get("error"),
-                )
-            except Exception as log_error:
-                logger.warning(
-                    "Failed to log Telegram history entry: %s", log_error, exc_info=True
-                )
+        _log_telegram_interaction(request, user_query, result)
 
         if result["success"]:
             return Response(result)
         else:
             return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def post_batch(self, user_queries, database_id, session_id, user_id):
+        """Process a list of natural language queries concurrently"""
+        from .ai_agent import aprocess_natural_language_queries
+
+        if not isinstance(user_queries, list) or not all(
+            isinstance(user_query, str) and user_query.strip() for user_query in user_queries
+        ):
+            return Response(
+                {"error": "queries must be a list of non-empty strings"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(user_queries) > self.MAX_BATCH_QUERIES:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH_QUERIES} queries per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = async_to_sync(aprocess_natural_language_queries)(
+            user_queries,
+            database_id,
+            session_id=session_id,
+            user_id=user_id,
+        )
+
+        return Response({
+            "success": all(result.get("success") for result in results),
+            "results": results,
+        })
+
+
+class AIQueryStreamView(APIView):
+    """
+    Streaming variant of the AI query endpoint (Server-Sent Events)
+
+    Emits "sql"/"sql_result" events as the agent runs queries, "token"
+    events with the answer text as the LLM generates it, an "answer" event
+    once the agent is done, and a final "done" event (after the data preview
+    and chart are built) whose data is the same payload AIQueryView returns.
+
+    Example:
+    POST /api/mcp/ai-query/stream/
+    {
+        "database_id": 1,
+        "query": "How many transactions were made in Almaty?"
+    }
+    """
+
+    def post(self, request):
+        """Stream natural language query progress"""
+        from .ai_agent import stream_natural_language_query
+
+        user_query = request.data.get("query")
+        database_id = request.data.get("database_id")
+
+        if not user_query:
+            return Response(
+                {"error": "query is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not database_id:
+            return Response(
+                {"error": "database_id is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        events = stream_natural_language_query(
+            user_query=user_query,
+            database_id=database_id,
+            session_id=request.headers.get("X-Session-ID"),
+            user_id=request.headers.get("X-User-ID"),
+        )
+
+        # Under ASGI a sync iterator would be buffered whole before anything is sent
+        if isinstance(request._request, ASGIRequest):
+            stream = _async_sse_stream(request, user_query, events)
+        else:
+            stream = _sse_stream(request, user_query, events)
+
+        response = StreamingHttpResponse(stream, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Don't let nginx buffer the stream
+        return response
+
+
+class AIQueryVisualizationView(APIView):
+    """
+    Poll a visualization deferred by the AI query endpoint
+
+    With MCP_DEFER_VISUALIZATION enabled, AI query responses carry a
+    visualization_task_id instead of the chart.
+
+    Example:
+    GET /api/mcp/ai-query/visualization/viz_18bcfe56800_1f4_0/
+    """
+
+    def get(self, request, task_id):
+        """Return the visualization, or 202 while it is still rendering"""
+        from .ai_agent import get_deferred_visualization
+
+        result = get_deferred_visualization(task_id)
+        if result is None:
+            return Response(
+                {"error": "Visualization task not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if result["status"] == "pending":
+            return Response(result, status=status.HTTP_202_ACCEPTED)
+        return Response(result)
+
+
+def _sse_frame(event):
+    """Encode a stream event as a Server-Sent Events frame"""
+    data = event["response"] if event["type"] == "done" else event
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+
+def _sse_stream(request, user_query, events):
+    """Yield SSE frames for AI query stream events (WSGI)"""
+    for event in events:
+        if event["type"] == "done":
+            _log_telegram_interaction(request, user_query, event["response"])
+        yield _sse_frame(event)
+
+
+async def _async_sse_stream(request, user_query, events):
+    """
+    Yield SSE frames for AI query stream events (ASGI)
+
+    Each event is awaited from a worker thread, so frames are sent as soon as
+    the agent produces them instead of after the whole run.
+    """
+    # Waiting on the event queue touches no DB connection, so it can run outside the sync thread
+    next_event = sync_to_async(next, thread_sensitive=False)
+    while (event := await next_event(events, None)) is not None:
+        if event["type"] == "done":
+            await sync_to_async(_log_telegram_interaction)(request, user_query, event["response"])
+        yield _sse_frame(event)
+
+
+def _log_telegram_interaction(request, user_query, result):
+    """Persist interaction for Telegram users so History tab can show recent queries"""
+    telegram_user = get_telegram_user_from_request(request)
+    if not telegram_user:
+        return
+
+    try:
+        response_payload = result.get("result")
+        response_text = (
+            response_payload if isinstance(response_payload, str) else None
+        ) or result.get("error") or ""
+
+        ChatInteraction.objects.create(
+            user=telegram_user,
+            message_text=user_query,
+            response_text=response_text,
+            query_generated=result.get("sql_query"),
+            query_result=response_payload
+            if isinstance(response_payload, (dict, list))
+            else None,
+            success=result.get("success", False),
+            error_message=None if result.get("success") else result.get("error"),
+        )
+    except Exception as log_error:
+        logger.warning(
+            "Failed to log Telegram history entry: %s", log_error, exc_info=True
+        )
+
 
 class AudioTranscriptionView(APIView):
     """Upload audio and return Gemini transcription."""
@@ -1150,19 +1323,19 @@ class MCPStatisticsView(APIView):
 
 class ExportDataView(APIView):
     """
-    Export SQL query results to CSV or Excel format
+    Export SQL query results to CSV, Excel or Parquet format
     
     POST /api/mcp/export/
     {
         "sql_query": "SELECT * FROM table",
-        "format": "csv" | "excel",
+        "format": "csv" | "excel" | "parquet",
         "database_id": 1,
         "filename": "optional_custom_name"
     }
     """
 
     def post(self, request):
-        """Export query results to CSV or Excel"""
+        """Export query results to CSV, Excel or Parquet"""
         sql_query = request.data.get("sql_query")
         export_format = request.data.get("format", "csv").lower()
         database_id = request.data.get("database_id")
@@ -1175,9 +1348,9 @@ class ExportDataView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if export_format not in ["csv", "excel", "xlsx"]:
+        if export_format not in ["csv", "excel", "xlsx", "parquet"]:
             return Response(
-                {"error": "format must be 'csv' or 'excel'"},
+                {"error": "format must be 'csv', 'excel' or 'parquet'"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
@@ -1187,9 +1360,8 @@ class ExportDataView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validate SQL query (only SELECT statements)
-        sql_query_upper = sql_query.strip().upper()
-        if not sql_query_upper.startswith("SELECT"):
+        # Validate SQL query (only a single SELECT statement)
+        if not is_select_query(sql_query):
             return Response(
                 {"error": "Only SELECT queries are allowed for export"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -1209,8 +1381,10 @@ class ExportDataView(APIView):
                 )
 
             # Execute SQL query and get DataFrame
+            # Limit result size for safety (max 100k rows)
+            MAX_ROWS = 100000
             try:
-                df = pd.read_sql(sql_query, database.database_uri)
+                df = self.read_limited_dataframe(sql_query, database.database_uri, MAX_ROWS)
             except Exception as e:
                 return Response(
                     {"error": f"Failed to execute SQL query: {str(e)}"},
@@ -1224,12 +1398,6 @@ class ExportDataView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Limit result size for safety (max 100k rows)
-            MAX_ROWS = 100000
-            if len(df) > MAX_ROWS:
-                df = df.head(MAX_ROWS)
-                # Note: We could return a warning, but for simplicity, just truncate
-
             # Generate filename if not provided
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1275,6 +1443,18 @@ class ExportDataView(APIView):
                         {"error": f"Excel export failed: {str(excel_error)}"},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
                     )
+            elif export_format == "parquet":
+                # Parquet export (columnar, typed and compressed - no per-cell text encoding)
+                output = io.BytesIO()
+                df.to_parquet(output, engine='pyarrow', index=False)
+                parquet_content = output.getvalue()
+
+                response = HttpResponse(parquet_content, content_type='application/vnd.apache.parquet')
+                # Use both filename and filename* for better browser compatibility
+                safe_filename = quote(f"{filename}.parquet")
+                response['Content-Disposition'] = f'attachment; filename="{filename}.parquet"; filename*=UTF-8\'\'{safe_filename}'
+                response['Content-Length'] = str(len(parquet_content))
+                return response
             else:
                 # CSV export
                 output = io.StringIO()
@@ -1298,3 +1478,27 @@ class ExportDataView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def read_limited_dataframe(self, sql_query, database_uri, max_rows, chunksize=10000):
+        """
+        Read at most max_rows of query results
+
+        Rows are streamed through a server-side cursor in chunks and fetching
+        stops once the limit is reached, so large results are never fully
+        materialized on the client.
+        """
+        frames = []
+        fetched = 0
+
+        with get_sql_engine(database_uri).connect() as conn:
+            conn = conn.execution_options(stream_results=True)
+            for chunk in pd.read_sql(sql_query, conn, chunksize=chunksize):
+                frames.append(chunk)
+                fetched += len(chunk)
+                if fetched >= max_rows:
+                    break
+
+        if not frames:
+            return None
+
+        return pd.concat(frames, ignore_index=True).head(max_rows)
+
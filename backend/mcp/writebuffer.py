@@ -0,0 +1,118 @@
+"""
+Buffered writer for audit/log rows
+Rows nobody reads back within the request are queued and inserted in batches
+"""
+
+from collections import defaultdict, deque
+from django.conf import settings
+from django.db import connections
+import atexit
+import logging
+from typing import Optional
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """
+    Collect unsaved model instances and insert them with bulk_create
+
+    A flush runs on a background timer shortly after the first enqueue, or
+    immediately once max_size rows are pending (with flush_interval <= 0 every
+    enqueue flushes). The timer writes on its own thread and DB connection, so a
+    queued row is not visible to the enqueuing request and is not part of its
+    transaction. Rows still queued are lost if the process is killed
+    (SIGKILL, OOM) before a flush, so only use this for logging/audit records.
+    A failed batch insert is retried once, then written row by row so one bad
+    row does not drop the rest.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None, max_size: int = 500):
+        """
+        Args:
+            flush_interval: Seconds to wait before flushing queued rows (<= 0 writes on
+                enqueue). None reads MCP_WRITE_BUFFER_INTERVAL on every enqueue, so
+                tests can turn the timer thread off with override_settings.
+            max_size: Pending row count that triggers an immediate flush
+        """
+        self._flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def flush_interval(self) -> float:
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return getattr(settings, 'MCP_WRITE_BUFFER_INTERVAL', 0.2)
+
+    def enqueue(self, instance) -> None:
+        """Queue an unsaved model instance for insertion"""
+        flush_interval = self.flush_interval
+        with self._lock:
+            self._pending.append(instance)
+            flush_now = flush_interval <= 0 or len(self._pending) >= self.max_size
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert all queued rows, grouped by model"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            instances = list(self._pending)
+            self._pending.clear()
+
+        if not instances:
+            return
+
+        by_model = defaultdict(list)
+        for instance in instances:
+            by_model[type(instance)].append(instance)
+
+        for model, batch in by_model.items():
+            self._write(model, batch)
+
+    def _write(self, model, batch) -> None:
+        """Insert one model's rows, retrying once and then falling back to per-row inserts"""
+        for attempt in range(2):
+            try:
+                model.objects.bulk_create(batch, batch_size=self.max_size)
+                return
+            except Exception as e:
+                # bulk_create is atomic, so nothing from the failed attempt was written
+                logger.warning(
+                    "Failed to write %d buffered %s rows (attempt %d): %s",
+                    len(batch), model.__name__, attempt + 1, e,
+                )
+
+        failed = 0
+        for instance in batch:
+            try:
+                instance.save(force_insert=True)
+            except Exception as e:
+                failed += 1
+                logger.error("Dropped buffered %s row: %s", model.__name__, e)
+        if failed:
+            logger.error("Dropped %d of %d buffered %s rows", failed, len(batch), model.__name__)
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # Timer threads are short-lived; don't leave their DB connection open
+            connections.close_all()
+
+
+# Shared buffer for MCP audit rows (OpenAIMCPResponse only: SQLToolExecution ids are
+# returned to the caller, so those rows must exist before the response is sent)
+write_buffer = WriteBuffer()
+atexit.register(write_buffer.flush)
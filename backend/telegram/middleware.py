@@ -33,9 +33,10 @@ class TelegramAuthMiddleware:
         auth_header = request.headers.get('Authorization', '')
 
         # DEBUG: Log what we received
-        logger.info(f"Path: {request.path}")
-        logger.info(f"Authorization header: {auth_header[:50] if auth_header else 'EMPTY'}")
-        logger.info(f"All headers: {dict(request.headers)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Path: %s", request.path)
+            logger.debug("Authorization header: %s", auth_header[:50] if auth_header else 'EMPTY')
+            logger.debug("All headers: %s", dict(request.headers))
 
         if not auth_header.startswith('tma '):
             return JsonResponse(
@@ -9,6 +9,7 @@ export interface DataPreview {
   columns: string[];
   rows: Record<string, any>[];
   total_rows: number;
+  truncated?: boolean;
   preview_rows: number;
   has_more: boolean;
 }